@@ -0,0 +1,69 @@
+import hashlib
+import os
+import re
+from typing import Optional
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(DIGEST_PATTERN.match(digest or ""))
+
+def hash_file(path: str, start_offset: int = 0, hasher=None) -> str:
+    """SHA-256 de um arquivo, opcionalmente continuando um hash parcial a partir de start_offset"""
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()
+
+class BlobStore:
+    """Área de vídeos endereçados por conteúdo: <root>/<2 primeiros hex>/<sha256>
+
+    Cada vídeo é guardado uma única vez, não importa quantos itens da fila o usem.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        if not is_valid_digest(digest):
+            raise ValueError(f"Digest inválido: {digest}")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return is_valid_digest(digest) and os.path.exists(self.path_for(digest))
+
+    def size(self, digest: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path_for(digest))
+        except (OSError, ValueError):
+            return None
+
+    def ingest(self, src_path: str, digest: str) -> str:
+        """Move o arquivo para a área de blobs; se o conteúdo já existir, descarta a cópia"""
+        dest = self.path_for(digest)
+        if os.path.exists(dest):
+            os.remove(src_path)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(src_path, dest)
+        return dest
+
+    def remove(self, digest: str) -> None:
+        """Remove o blob e arquivos derivados (ex.: índice de keyframes)"""
+        dest = self.path_for(digest)
+        directory = os.path.dirname(dest)
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if name.startswith(digest):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
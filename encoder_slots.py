@@ -0,0 +1,39 @@
+import threading
+from contextlib import contextmanager
+
+class EncoderSlots:
+    """Limite de sessões simultâneas do encoder, contadas por saída
+
+    Um job com duas saídas codificadas (default e vertical no mesmo FFmpeg)
+    abre duas sessões do encoder e ocupa dois slots; o limite do pool de
+    threads sozinho conta jobs, não sessões.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._available = self.capacity
+        self._condition = threading.Condition()
+
+    def _weight(self, count: int) -> int:
+        # Um job nunca pede mais que a capacidade, senão esperaria para sempre
+        return min(max(1, count), self.capacity)
+
+    def acquire(self, count: int = 1) -> None:
+        count = self._weight(count)
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= count)
+            self._available -= count
+
+    def release(self, count: int = 1) -> None:
+        count = self._weight(count)
+        with self._condition:
+            self._available = min(self.capacity, self._available + count)
+            self._condition.notify_all()
+
+    @contextmanager
+    def hold(self, count: int = 1):
+        self.acquire(count)
+        try:
+            yield
+        finally:
+            self.release(count)
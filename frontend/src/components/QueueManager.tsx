@@ -1,7 +1,6 @@
 import {
   ActionIcon,
   Badge,
-  Button,
   Card,
   Group,
   Progress,
@@ -10,57 +9,37 @@ import {
   Title
 } from '@mantine/core';
 import { notifications } from '@mantine/notifications';
-import { IconDownload, IconPlayerPause, IconPlayerPlay, IconTrash } from '@tabler/icons-react';
-import { useEffect } from 'react';
+import { IconDownload, IconPlayerStop, IconTrash } from '@tabler/icons-react';
 import { useQueue } from '../hooks/useQueue';
 import type { QueueItem } from '../types/queue';
 
 const API_URL = 'http://localhost:8000';
 
 export default function QueueManager() {
+  // The server scheduler drains the queue on its own; the dashboard only observes it
   const {
-    state: { items, isProcessing },
+    state: { items },
     removeFromQueue,
     // updateQueueItem,
-    setCurrentItem,
-    setProcessing,
   } = useQueue();
 
-  const processNextItem = async () => {
-    if (isProcessing || !items.length) return;
-
-    const nextItem = items.find(item => item.status === 'pending');
-    if (!nextItem) return;
-
-    setProcessing(true);
-    setCurrentItem(nextItem);
-
+  const cancelItem = async (item: QueueItem) => {
     try {
-      const response = await fetch(`${API_URL}/queue/${nextItem.id}/process`, {
+      const response = await fetch(`${API_URL}/queue/${item.id}/cancel`, {
         method: 'POST',
       });
 
-      if (!response.ok) {
-        throw new Error('Failed to start processing');
-      }
+      if (!response.ok) throw new Error('Failed to cancel item');
     } catch (error) {
-      console.error('Error processing video:', error);
+      console.error('Error cancelling item:', error);
       notifications.show({
         title: 'Error',
-        message: 'Failed to process video',
+        message: 'Failed to cancel item',
         color: 'red',
       });
-      setProcessing(false);
-      setCurrentItem(null);
     }
   };
 
-  useEffect(() => {
-    if (!isProcessing && items.some(item => item.status === 'pending')) {
-      processNextItem();
-    }
-  }, [isProcessing, items]);
-
   const getStatusColor = (status: string) => {
     switch (status) {
       case 'completed':
@@ -69,6 +48,8 @@ export default function QueueManager() {
         return 'red';
       case 'processing':
         return 'blue';
+      case 'cancelled':
+        return 'orange';
       default:
         return 'gray';
     }
@@ -104,25 +85,6 @@ export default function QueueManager() {
     <Stack gap="md" px={{ base: 'xs', sm: 'md', md: 'xl' }}>
       <Group justify="space-between" wrap="wrap" gap="md">
         <Title order={2}>Queue Manager</Title>
-        <Group gap="xs" wrap="wrap">
-          <Button
-            leftSection={<IconPlayerPlay size={16} />}
-            onClick={processNextItem}
-            disabled={isProcessing || !items.some(item => item.status === 'pending')}
-            w={{ base: '100%', sm: 'auto' }}
-          >
-            Process Next
-          </Button>
-          <Button
-            leftSection={<IconPlayerPause size={16} />}
-            onClick={() => setProcessing(false)}
-            disabled={!isProcessing}
-            color="red"
-            w={{ base: '100%', sm: 'auto' }}
-          >
-            Stop Processing
-          </Button>
-        </Group>
       </Group>
 
       <Stack gap="sm">
@@ -140,6 +102,14 @@ export default function QueueManager() {
                     <IconDownload size={16} />
                   </ActionIcon>
                 )}
+                {(item.status === 'pending' || item.status === 'processing') && (
+                  <ActionIcon
+                    color="orange"
+                    onClick={() => cancelItem(item)}
+                  >
+                    <IconPlayerStop size={16} />
+                  </ActionIcon>
+                )}
                 <ActionIcon
                   color="red"
                   onClick={() => removeFromQueue(item.id)}
@@ -1,18 +1,72 @@
 import { notifications } from '@mantine/notifications';
 import type { ReactNode } from 'react';
-import { useEffect, useReducer } from 'react';
+import { useCallback, useEffect, useReducer } from 'react';
+import type { WebSocketMessage } from '../hooks/useWebSocket';
 import { useWebSocket } from '../hooks/useWebSocket';
 import type { QueueAction, QueueItem, QueueState } from '../types/queue';
 import { QueueContext } from './QueueContextDefinition';
 
 const API_URL = 'http://localhost:8000';
 const WS_URL = 'ws://localhost:8000/ws/queue';
-const POLLING_INTERVAL = 2000; // 2 seconds
+const UPLOAD_MAX_RETRIES = 3;
+
+interface UploadSession {
+    id: string;
+    size: number;
+    ranges: [number, number][];
+    complete: boolean;
+    chunkSize?: number;
+}
+
+// Returns the [start, end) ranges of the file the server has not received yet
+function missingRanges(session: UploadSession, chunkSize: number): [number, number][] {
+    const missing: [number, number][] = [];
+    let position = 0;
+    for (const [start, end] of [...session.ranges, [session.size, session.size] as [number, number]]) {
+        for (let offset = position; offset < start; offset += chunkSize) {
+            missing.push([offset, Math.min(offset + chunkSize, start)]);
+        }
+        position = Math.max(position, end);
+    }
+    return missing;
+}
+
+async function uploadInChunks(file: File, metadata: Record<string, unknown>): Promise<void> {
+    let response = await fetch(`${API_URL}/uploads/`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ fileName: file.name, size: file.size, ...metadata }),
+    });
+    if (!response.ok) throw new Error('Failed to create upload session');
+    let session: UploadSession = await response.json();
+    const chunkSize = session.chunkSize ?? 8 * 1024 * 1024;
+
+    for (let attempt = 0; !session.complete; attempt++) {
+        if (attempt > UPLOAD_MAX_RETRIES) throw new Error('Failed to upload video');
+        try {
+            for (const [start, end] of missingRanges(session, chunkSize)) {
+                response = await fetch(`${API_URL}/uploads/${session.id}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Range': `bytes ${start}-${end - 1}/${file.size}` },
+                    body: file.slice(start, end),
+                });
+                if (!response.ok) throw new Error('Failed to upload chunk');
+                session = await response.json();
+            }
+        } catch (error) {
+            console.error('Upload interrupted, resuming:', error);
+        }
+        // Ask the server which ranges it already has before resuming
+        response = await fetch(`${API_URL}/uploads/${session.id}`);
+        if (response.ok) session = await response.json();
+    }
+
+    response = await fetch(`${API_URL}/uploads/${session.id}/finalize`, { method: 'POST' });
+    if (!response.ok) throw new Error('Failed to finalize upload');
+}
 
 const initialState: QueueState = {
     items: [],
-    currentItem: null,
-    isProcessing: false,
 };
 
 async function loadQueue(): Promise<QueueItem[]> {
@@ -38,11 +92,14 @@ function queueReducer(state: QueueState, action: QueueAction): QueueState {
                 ...state,
                 items: [...state.items, action.payload],
             };
+        case 'UPSERT_ITEM':
+            return state.items.some(item => item.id === action.payload.id)
+                ? queueReducer(state, { type: 'UPDATE_ITEM', payload: action.payload })
+                : { ...state, items: [...state.items, action.payload] };
         case 'REMOVE_ITEM':
             return {
                 ...state,
                 items: state.items.filter(item => item.id !== action.payload),
-                currentItem: state.currentItem?.id === action.payload ? null : state.currentItem,
             };
         case 'UPDATE_ITEM':
             return {
@@ -50,20 +107,6 @@ function queueReducer(state: QueueState, action: QueueAction): QueueState {
                 items: state.items.map(item =>
                     item.id === action.payload.id ? { ...item, ...action.payload } : item
                 ),
-                currentItem:
-                    state.currentItem?.id === action.payload.id
-                        ? { ...state.currentItem, ...action.payload }
-                        : state.currentItem,
-            };
-        case 'SET_CURRENT_ITEM':
-            return {
-                ...state,
-                currentItem: action.payload,
-            };
-        case 'SET_PROCESSING':
-            return {
-                ...state,
-                isProcessing: action.payload,
             };
         case 'CLEAR_COMPLETED':
             return {
@@ -80,8 +123,6 @@ export interface QueueContextType {
     addToQueue: (item: Omit<QueueItem, 'id' | 'status' | 'progress' | 'createdAt' | 'updatedAt'>) => Promise<void>;
     removeFromQueue: (id: string) => Promise<void>;
     updateQueueItem: (id: string, updates: Partial<QueueItem>) => void;
-    setCurrentItem: (item: QueueItem | null) => void;
-    setProcessing: (isProcessing: boolean) => void;
     clearCompleted: () => void;
     refreshQueue: () => Promise<void>;
 }
@@ -89,12 +130,20 @@ export interface QueueContextType {
 export function QueueProvider({ children }: { children: ReactNode }) {
     const [state, dispatch] = useReducer(queueReducer, initialState);
 
-    // Handle WebSocket messages
-    const handleWebSocketMessage = (data: { type: string; items: QueueItem[] }) => {
-        if (data.type === 'queue_update') {
-            dispatch({ type: 'SET_ITEMS', payload: data.items });
+    // Handle WebSocket messages: a snapshot on connect, then per-item events
+    const handleWebSocketMessage = useCallback((data: WebSocketMessage) => {
+        switch (data.type) {
+            case 'snapshot':
+                dispatch({ type: 'SET_ITEMS', payload: data.items });
+                break;
+            case 'item_updated':
+                dispatch({ type: 'UPSERT_ITEM', payload: data.item });
+                break;
+            case 'item_removed':
+                dispatch({ type: 'REMOVE_ITEM', payload: data.id });
+                break;
         }
-    };
+    }, []);
 
     // Initialize WebSocket connection
     useWebSocket(WS_URL, handleWebSocketMessage);
@@ -110,30 +159,13 @@ export function QueueProvider({ children }: { children: ReactNode }) {
         refreshQueue();
     }, []);
 
-    // Polling for pending items
-    useEffect(() => {
-        const hasPendingItems = state.items.some(item => item.status === 'pending' || item.status === 'processing');
-
-        if (hasPendingItems) {
-            const interval = setInterval(refreshQueue, POLLING_INTERVAL);
-            return () => clearInterval(interval);
-        }
-    }, [state.items]);
-
     const addToQueue = async (item: Omit<QueueItem, 'id' | 'status' | 'progress' | 'createdAt' | 'updatedAt'>) => {
         try {
-            const formData = new FormData();
             if (!item.file) throw new Error('File is required');
-            formData.append('file', item.file);
-            formData.append('defaults', item.selectedMinutes.default.join(','));
-            formData.append('verticals', item.selectedMinutes.vertical.join(','));
-
-            const response = await fetch(`${API_URL}/upload/`, {
-                method: 'POST',
-                body: formData,
+            await uploadInChunks(item.file, {
+                defaults: item.selectedMinutes.default,
+                verticals: item.selectedMinutes.vertical,
             });
-
-            if (!response.ok) throw new Error('Failed to upload video');
         } catch (error) {
             console.error('Error adding to queue:', error);
             notifications.show({
@@ -165,14 +197,6 @@ export function QueueProvider({ children }: { children: ReactNode }) {
         dispatch({ type: 'UPDATE_ITEM', payload: { id, ...updates } });
     };
 
-    const setCurrentItem = (item: QueueItem | null) => {
-        dispatch({ type: 'SET_CURRENT_ITEM', payload: item });
-    };
-
-    const setProcessing = (isProcessing: boolean) => {
-        dispatch({ type: 'SET_PROCESSING', payload: isProcessing });
-    };
-
     const clearCompleted = () => {
         dispatch({ type: 'CLEAR_COMPLETED' });
     };
@@ -184,8 +208,6 @@ export function QueueProvider({ children }: { children: ReactNode }) {
                 addToQueue,
                 removeFromQueue,
                 updateQueueItem,
-                setCurrentItem,
-                setProcessing,
                 clearCompleted,
                 refreshQueue,
             }}
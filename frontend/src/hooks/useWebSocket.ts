@@ -1,45 +1,78 @@
 import { useEffect, useRef } from 'react';
 
-interface WebSocketMessage {
+export interface WebSocketMessage {
   type: string;
-  items: any[];
+  seq?: number;
+  epoch?: string;
+  [key: string]: any;
 }
 
+const RECONNECT_BASE_DELAY = 1000;
+const RECONNECT_MAX_DELAY = 30000;
+
 export function useWebSocket(url: string, onMessage: (data: WebSocketMessage) => void) {
   const ws = useRef<WebSocket | null>(null);
+  const onMessageRef = useRef(onMessage);
+  // Last sequence seen, sent back on reconnect so the server only replays missed events
+  const resume = useRef<{ epoch?: string; seq?: number }>({});
+
+  useEffect(() => {
+    onMessageRef.current = onMessage;
+  }, [onMessage]);
 
   useEffect(() => {
-    // Create WebSocket connection
-    ws.current = new WebSocket(url);
-
-    // Connection opened
-    ws.current.addEventListener('open', () => {
-      console.log('WebSocket connection established');
-    });
-
-    // Listen for messages
-    ws.current.addEventListener('message', (event) => {
-      const data = JSON.parse(event.data);
-      onMessage(data);
-    });
-
-    // Connection closed
-    ws.current.addEventListener('close', () => {
-      console.log('WebSocket connection closed');
-    });
-
-    // Connection error
-    ws.current.addEventListener('error', (error) => {
-      console.error('WebSocket error:', error);
-    });
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let attempts = 0;
+    let closed = false;
+
+    const connect = () => {
+      const { epoch, seq } = resume.current;
+      const connectUrl = epoch !== undefined && seq !== undefined
+        ? `${url}?since=${seq}&epoch=${encodeURIComponent(epoch)}`
+        : url;
+      const socket = new WebSocket(connectUrl);
+      ws.current = socket;
+
+      // Connection opened
+      socket.addEventListener('open', () => {
+        attempts = 0;
+        console.log('WebSocket connection established');
+      });
+
+      // Listen for messages
+      socket.addEventListener('message', (event) => {
+        const data: WebSocketMessage = JSON.parse(event.data);
+        if (data.epoch !== undefined) resume.current.epoch = data.epoch;
+        if (data.seq !== undefined) resume.current.seq = data.seq;
+        onMessageRef.current(data);
+      });
+
+      // Connection closed: retry with exponential backoff
+      socket.addEventListener('close', () => {
+        console.log('WebSocket connection closed');
+        if (closed) return;
+        const delay = Math.min(RECONNECT_BASE_DELAY * 2 ** attempts, RECONNECT_MAX_DELAY);
+        attempts += 1;
+        reconnectTimer = setTimeout(connect, delay);
+      });
+
+      // Connection error
+      socket.addEventListener('error', (error) => {
+        console.error('WebSocket error:', error);
+      });
+    };
+
+    connect();
 
     // Cleanup on unmount
     return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
       if (ws.current) {
         ws.current.close();
       }
     };
-  }, [url, onMessage]);
+  }, [url]);
 
   return ws.current;
-} 
\ No newline at end of file
+}
\ No newline at end of file
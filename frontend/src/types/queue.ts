@@ -2,7 +2,7 @@ export interface QueueItem {
   id: string;
   fileName: string;
   file?: File;
-  status: 'pending' | 'processing' | 'completed' | 'failed';
+  status: 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
   progress: number;
   selectedMinutes: {
     default: number[];
@@ -15,19 +15,19 @@ export interface QueueItem {
   };
   createdAt: string;
   updatedAt: string;
+  fastCut?: boolean;
+  priority?: number;
+  blobDigest?: string;
 }
 
 export interface QueueState {
   items: QueueItem[];
-  currentItem: QueueItem | null;
-  isProcessing: boolean;
 }
 
 export type QueueAction =
   | { type: 'SET_ITEMS'; payload: QueueItem[] }
   | { type: 'ADD_ITEM'; payload: QueueItem }
+  | { type: 'UPSERT_ITEM'; payload: QueueItem }
   | { type: 'REMOVE_ITEM'; payload: string }
   | { type: 'UPDATE_ITEM'; payload: Partial<QueueItem> & { id: string } }
-  | { type: 'SET_CURRENT_ITEM'; payload: QueueItem | null }
-  | { type: 'SET_PROCESSING'; payload: boolean }
   | { type: 'CLEAR_COMPLETED' }; 
\ No newline at end of file
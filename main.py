@@ -1,234 +1,312 @@
 import sys
 import os
+import multiprocessing
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QPushButton, QLabel, QScrollArea, QCheckBox, QFileDialog, QFrame, QSizePolicy,
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLabel, QListView, QStyledItemDelegate, QFileDialog, QFrame,
+    QDialog, QScrollArea,
     QSystemTrayIcon, QMenu, QMenuBar
 )
 from PyQt6.QtGui import (
-    QGuiApplication, QPixmap, QImage, QColor, QPalette, QIcon, QFont,
+    QGuiApplication, QPixmap, QImage, QColor, QPalette, QIcon, QFont, QPainter, QPen, QPolygonF,
     QDragEnterEvent, QDropEvent, QAction
 )
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QUrl, QMimeData, QStandardPaths
-import cv2
+from PyQt6.QtCore import (
+    Qt, QTimer, QThread, pyqtSignal, QUrl, QMimeData, QStandardPaths,
+    QAbstractListModel, QModelIndex, QSize, QRect, QRectF, QPoint, QPointF, QEvent
+)
 from video_utils import extract_segments
+from thumbnail_cache import iter_cached_thumbnails
+from thumbnail_utils import MINUTE_INTERVAL, ThumbnailPolicy, get_video_duration, iter_detail_frames
 from platform_utils import get_platform_config, is_macos, is_windows, is_apple_silicon
 
 class FrameLoaderThread(QThread):
-    frames_loaded = pyqtSignal(list, list)
+    frame_ready = pyqtSignal(int, object, float)  # índice, quadro RGB, instante
+    loading_finished = pyqtSignal(int)  # total de miniaturas
     progress_updated = pyqtSignal(int)
     
-    def __init__(self, file_path):
+    def __init__(self, file_path, policy):
         super().__init__()
         self.file_path = file_path
+        self.policy = policy
         
     def run(self):
-        video_cap = cv2.VideoCapture(self.file_path)
-        if not video_cap.isOpened():
-            self.frames_loaded.emit([], [])
-            return
-            
-        fps = video_cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(video_cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frames_to_capture = range(0, total_frames, int(fps * 60))
-        
-        frames = []
-        frame_times = []
-        
-        for i, frame_number in enumerate(frames_to_capture):
-            video_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            success, frame = video_cap.read()
-            if not success:
-                break
-            
-            # Otimização para Apple Silicon: usar interpolação mais eficiente
-            config = get_platform_config()
-            if config.is_apple_silicon:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_rgb = cv2.resize(frame_rgb, (500, 375), interpolation=cv2.INTER_LINEAR)
-            else:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_rgb = cv2.resize(frame_rgb, (500, 375), interpolation=cv2.INTER_CUBIC)
-            
-            frames.append(frame_rgb)
-            frame_times.append(frame_number / fps)
-            
-            # Emitir progresso
-            progress = int((i + 1) / len(frames_to_capture) * 100)
-            self.progress_updated.emit(progress)
-            
-        video_cap.release()
-        self.frames_loaded.emit(frames, frame_times)
-
-class ThumbnailWidget(QWidget):
-    def __init__(self, image_data, minute, time_str, parent=None):
+        # Uma miniatura por minuto, decodificando apenas keyframes (ou lida do
+        # cache em disco); cada uma é entregue à interface assim que chega.
+        # Vídeos longos usam miniaturas menores para caber no orçamento de memória
+        size = self.policy.thumbnail_size(get_video_duration(self.file_path))
+        count = 0
+        for frame, frame_time in iter_cached_thumbnails(
+            self.file_path, MINUTE_INTERVAL, size, on_progress=self.progress_updated.emit
+        ):
+            if self.isInterruptionRequested():
+                return
+            self.frame_ready.emit(count, frame, frame_time)
+            count += 1
+        self.loading_finished.emit(count)
+
+# Quadros da visão ampliada: menores que a miniatura da grade, vários lado a lado
+DETAIL_FRAME_SIZE = (320, 240)
+
+class DetailLoaderThread(QThread):
+    """Carrega os quadros detalhados de um minuto sob demanda"""
+    frame_ready = pyqtSignal(object, float)
+
+    def __init__(self, file_path, start, end, interval, parent=None):
         super().__init__(parent)
-        self.minute = minute
-        self.parent_app = parent
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(8, 8, 8, 8)  # Reduzido para economizar espaço
-        layout.setSpacing(5)
-        self.setLayout(layout)
-        
-        # Definir tamanho fixo para o widget para evitar barras de rolagem
-        self.setFixedSize(350, 300)  # Tamanho aumentado proporcionalmente mantendo qualidade
+        self.file_path = file_path
+        self.start_time = start
+        self.end_time = end
+        self.interval = interval
 
-        height, width, channel = image_data.shape
-        bytes_per_line = 3 * width
-        qimage = QImage(image_data.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-        self.pixmap = QPixmap.fromImage(qimage)
-        
-        # Otimização para displays de alta densidade (Retina)
-        config = get_platform_config()
-        self.pixmap.setDevicePixelRatio(config.ui_scaling)
-
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        # Removido setMinimumSize para evitar barras de rolagem desnecessárias
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.image_label.setScaledContents(True)  # Permite que a imagem se ajuste ao tamanho do label
-        
-        # Estilo adaptado para tema escuro nativo do macOS
-        if is_macos() and config.native_features.get('dark_mode_detection'):
-            self.image_label.setStyleSheet("""
-                QLabel {
-                    background-color: #1e1e1e;
-                    border: 1px solid #3a3a3a;
-                    border-radius: 8px;
-                }
-            """)
-        else:
-            self.image_label.setStyleSheet("""
-                QLabel {
-                    background-color: #333;
-                    border: 1px solid #555;
-                    border-radius: 5px;
-                }
-            """)
-        
-        self.update_image()
-        layout.addWidget(self.image_label)
+    def run(self):
+        for frame, frame_time in iter_detail_frames(
+            self.file_path, self.start_time, self.end_time, self.interval, DETAIL_FRAME_SIZE
+        ):
+            if self.isInterruptionRequested():
+                return
+            self.frame_ready.emit(frame, frame_time)
+
+class DetailStripDialog(QDialog):
+    """Visão ampliada de um minuto: quadros a cada poucos segundos, carregados ao abrir"""
 
-        time_label = QLabel(f"Time: {time_str}")
+    def __init__(self, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        layout = QVBoxLayout(self)
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setFrameShape(QFrame.Shape.NoFrame)
+        content = QWidget()
+        self.strip_layout = QHBoxLayout(content)
+        self.strip_layout.setSpacing(10)
+        self.strip_layout.addStretch()
+        scroll_area.setWidget(content)
+        layout.addWidget(scroll_area)
+        self.resize(1100, DETAIL_FRAME_SIZE[1] + 110)
+
+    def add_frame(self, frame, frame_time):
+        height, width, channel = frame.shape
+        qimage = QImage(frame.data, width, height, 3 * width, QImage.Format.Format_RGB888)
+
+        tile = QVBoxLayout()
+        image_label = QLabel()
+        image_label.setPixmap(QPixmap.fromImage(qimage))
+        tile.addWidget(image_label)
+        time_label = QLabel(f"{int(frame_time // 60):02d}:{int(frame_time % 60):02d}")
         time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         time_label.setStyleSheet("color: #aaa; font-size: 12px;")
-        layout.addWidget(time_label)
+        tile.addWidget(time_label)
+        # Antes do stretch final: quadros em ordem, alinhados à esquerda
+        self.strip_layout.insertLayout(self.strip_layout.count() - 1, tile)
 
-        checkbox_layout = QHBoxLayout()
-        checkbox_layout.setContentsMargins(0, 5, 0, 0)
-        checkbox_layout.setSpacing(5)
-        
-        self.default_check = QCheckBox("Default")
-        self.vertical_check = QCheckBox("Vertical")
+# Papéis do modelo para a seleção de cada minuto
+DEFAULT_ROLE = Qt.ItemDataRole.UserRole + 1
+VERTICAL_ROLE = Qt.ItemDataRole.UserRole + 2
 
-        # Estilo de checkbox adaptado para macOS
-        if is_macos():
-            checkbox_style = """
-                QCheckBox {
-                    color: white;
-                    padding: 4px;
-                    background-color: #2a2a2a;
-                    border-radius: 6px;
-                    font-size: 13px;
-                }
-                QCheckBox::indicator {
-                    width: 20px;
-                    height: 20px;
-                    border-radius: 4px;
-                }
-                QCheckBox::indicator:checked {
-                    background-color: #007AFF;
-                    border: 1px solid #0051D5;
-                }
-                QCheckBox::indicator:unchecked {
-                    background-color: #48484a;
-                    border: 1px solid #6d6d70;
-                }
-            """
-        else:
-            checkbox_style = """
-                QCheckBox {
-                    color: white;
-                    padding: 3px;
-                    background-color: #3a3a3a;
-                    border-radius: 4px;
-                    font-size: 13px;
-                }
-                QCheckBox::indicator {
-                    width: 18px;
-                    height: 18px;
-                }
-                QCheckBox::indicator:checked {
-                    background-color: #0047AB;
-                    border: 1px solid #5d1d7d;
-                }
-                QCheckBox::indicator:unchecked {
-                    background-color: #555;
-                    border: 1px solid #777;
-                }
-            """
-        
-        self.default_check.setStyleSheet(checkbox_style)
-        self.vertical_check.setStyleSheet(checkbox_style)
+class ThumbnailListModel(QAbstractListModel):
+    """Miniaturas dos minutos do vídeo e a seleção default/vertical de cada uma"""
 
-        self.default_check.stateChanged.connect(self.handle_checkbox_change)
-        self.vertical_check.stateChanged.connect(self.handle_checkbox_change)
-        
-        checkbox_layout.addWidget(self.default_check)
-        checkbox_layout.addWidget(self.vertical_check)
-        layout.addLayout(checkbox_layout)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row['time_str']
+        if role == Qt.ItemDataRole.DecorationRole:
+            return row['pixmap']
+        if role == DEFAULT_ROLE:
+            return row['default']
+        if role == VERTICAL_ROLE:
+            return row['vertical']
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role not in (DEFAULT_ROLE, VERTICAL_ROLE):
+            return False
+        key = 'default' if role == DEFAULT_ROLE else 'vertical'
+        self._rows[index.row()][key] = bool(value)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+    def append_thumbnail(self, pixmap, time_str):
+        position = len(self._rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.append({
+            'pixmap': pixmap, 'scaled': {}, 'time_str': time_str, 'default': False, 'vertical': False
+        })
+        self.endInsertRows()
+
+    def scaled_pixmap(self, row, size, device_ratio):
+        """Miniatura ajustada a `size` (pixels lógicos), redimensionada uma única vez por tamanho
+
+        As cópias ficam guardadas na linha, então repinturas (rolagem, seleção)
+        só desenham o pixmap pronto, sem reamostrar a imagem.
+        """
+        entry = self._rows[row]
+        key = (size.width(), size.height(), device_ratio)
+        scaled = entry['scaled'].get(key)
+        if scaled is None:
+            source = entry['pixmap']
+            physical = QSize(round(size.width() * device_ratio), round(size.height() * device_ratio))
+            scaled = source.scaled(
+                physical, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            scaled.setDevicePixelRatio(device_ratio)
+            # O tamanho do tile só muda com a janela: basta a cópia mais recente
+            entry['scaled'] = {key: scaled}
+        return scaled
+
+    def set_all(self, role, value):
+        """Marca ou desmarca uma seleção em todos os minutos com um único sinal"""
+        if not self._rows:
+            return
+        key = 'default' if role == DEFAULT_ROLE else 'vertical'
+        for row in self._rows:
+            row[key] = value
+        self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1), [role])
+
+    def selected_minutes(self, role):
+        key = 'default' if role == DEFAULT_ROLE else 'vertical'
+        return [minute for minute, row in enumerate(self._rows) if row[key]]
 
-        # Estilo do widget principal adaptado para macOS
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Desenha cada minuto (miniatura, horário e caixas Default/Vertical) só quando visível"""
+
+    # Duplo clique na imagem pede a visão ampliada do minuto
+    detail_requested = pyqtSignal(int)
+
+    TILE_SIZE = QSize(350, 300)
+    MARGIN = 8
+    SPACING = 5
+    TIME_HEIGHT = 18
+    CHECKBOX_HEIGHT = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Cores equivalentes às folhas de estilo do tema de cada plataforma
         if is_macos():
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #2a2a2a;
-                    border-radius: 10px;
-                    padding: 2px;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #3a3a3a;
-                    border-radius: 8px;
-                    padding: 2px;
-                }
-            """)
-    
-    def update_image(self):
-        if not self.pixmap.isNull():
-            # Definir um tamanho padrão para o cálculo se o widget ainda não foi renderizado
-            label_width = max(self.image_label.width(), 375)
-            label_height = max(self.image_label.height(), 281)
-            
-            scaled_pixmap = self.pixmap.scaled(
-                label_width, 
-                label_height,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
-    
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.update_image()
-    
-    def handle_checkbox_change(self):
-        if self.default_check.isChecked():
-            if self.minute not in self.parent_app.selected_times_default:
-                self.parent_app.selected_times_default.append(self.minute)
-        else:
-            if self.minute in self.parent_app.selected_times_default:
-                self.parent_app.selected_times_default.remove(self.minute)
-                
-        if self.vertical_check.isChecked():
-            if self.minute not in self.parent_app.selected_times_vertical:
-                self.parent_app.selected_times_vertical.append(self.minute)
+            self.tile_color = QColor('#2a2a2a')
+            self.tile_radius = 10
+            self.image_color, self.image_border = QColor('#1e1e1e'), QColor('#3a3a3a')
+            self.check_color, self.check_border = QColor('#007AFF'), QColor('#0051D5')
+            self.uncheck_color, self.uncheck_border = QColor('#48484a'), QColor('#6d6d70')
+            self.checkbox_color = QColor('#2a2a2a')
         else:
-            if self.minute in self.parent_app.selected_times_vertical:
-                self.parent_app.selected_times_vertical.remove(self.minute)
+            self.tile_color = QColor('#3a3a3a')
+            self.tile_radius = 8
+            self.image_color, self.image_border = QColor('#333'), QColor('#555')
+            self.check_color, self.check_border = QColor('#0047AB'), QColor('#5d1d7d')
+            self.uncheck_color, self.uncheck_border = QColor('#555'), QColor('#777')
+            self.checkbox_color = QColor('#3a3a3a')
+
+    def sizeHint(self, option, index):
+        return self.TILE_SIZE
+
+    def _tile_rect(self, rect):
+        """Área do tile centralizada na célula da grade"""
+        tile = QRect(QPoint(0, 0), self.TILE_SIZE)
+        tile.moveCenter(rect.center())
+        return tile
+
+    def _layout(self, rect):
+        tile = self._tile_rect(rect)
+        content = tile.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        checkbox_top = content.bottom() - self.CHECKBOX_HEIGHT + 1
+        time_top = checkbox_top - self.SPACING - self.TIME_HEIGHT
+        image = QRect(content.left(), content.top(), content.width(), time_top - self.SPACING - content.top())
+        time = QRect(content.left(), time_top, content.width(), self.TIME_HEIGHT)
+        half = (content.width() - self.SPACING) // 2
+        default_box = QRect(content.left(), checkbox_top, half, self.CHECKBOX_HEIGHT)
+        vertical_box = QRect(content.left() + half + self.SPACING, checkbox_top, half, self.CHECKBOX_HEIGHT)
+        return tile, image, time, default_box, vertical_box
+
+    def paint(self, painter, option, index):
+        tile, image, time, default_box, vertical_box = self._layout(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.tile_color)
+        painter.drawRoundedRect(QRectF(tile), self.tile_radius, self.tile_radius)
+
+        painter.setPen(self.image_border)
+        painter.setBrush(self.image_color)
+        painter.drawRoundedRect(QRectF(image), 5, 5)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            scaled = index.model().scaled_pixmap(index.row(), image.size(), painter.device().devicePixelRatioF())
+            target_rect = QRect(QPoint(0, 0), scaled.deviceIndependentSize().toSize())
+            target_rect.moveCenter(image.center())
+            # Já no tamanho final: desenho 1:1, sem reamostragem a cada pintura
+            painter.drawPixmap(target_rect.topLeft(), scaled)
+
+        painter.setPen(QColor('#aaa'))
+        font = QFont(option.font)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.drawText(time, Qt.AlignmentFlag.AlignCenter, f"Time: {index.data(Qt.ItemDataRole.DisplayRole)}")
+
+        font.setPixelSize(13)
+        painter.setFont(font)
+        self._paint_checkbox(painter, default_box, "Default", index.data(DEFAULT_ROLE))
+        self._paint_checkbox(painter, vertical_box, "Vertical", index.data(VERTICAL_ROLE))
+        painter.restore()
+
+    def _paint_checkbox(self, painter, rect, text, checked):
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.checkbox_color)
+        painter.drawRoundedRect(QRectF(rect), 5, 5)
+
+        indicator = QRect(rect.left() + 4, rect.center().y() - 9, 18, 18)
+        painter.setPen(self.check_border if checked else self.uncheck_border)
+        painter.setBrush(self.check_color if checked else self.uncheck_color)
+        painter.drawRoundedRect(QRectF(indicator), 4, 4)
+        if checked:
+            pen = QPen(QColor('white'), 2)
+            painter.setPen(pen)
+            painter.drawPolyline(QPolygonF([
+                QPointF(indicator.left() + 4, indicator.center().y()),
+                QPointF(indicator.left() + 8, indicator.bottom() - 4),
+                QPointF(indicator.right() - 3, indicator.top() + 4),
+            ]))
+
+        painter.setPen(QColor('white'))
+        text_rect = rect.adjusted(indicator.width() + 10, 0, 0, 0)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+    def editorEvent(self, event, model, option, index):
+        """Alterna Default/Vertical com um clique, sem widgets de checkbox por minuto"""
+        if event.type() not in (QEvent.Type.MouseButtonRelease, QEvent.Type.MouseButtonDblClick) \
+                or event.button() != Qt.MouseButton.LeftButton:
+            return False
+        _, image, _, default_box, vertical_box = self._layout(option.rect)
+        position = event.position().toPoint()
+        if event.type() == QEvent.Type.MouseButtonDblClick:
+            if image.contains(position):
+                self.detail_requested.emit(index.row())
+                return True
+            return False
+        for role, box in ((DEFAULT_ROLE, default_box), (VERTICAL_ROLE, vertical_box)):
+            if box.contains(position):
+                model.setData(index, not index.data(role), role)
+                return True
+        return False
 
 class VideoSegmenterApp(QMainWindow):
     def __init__(self):
@@ -239,8 +317,16 @@ class VideoSegmenterApp(QMainWindow):
         
         self.file_path = None
         self.clip = None
-        self.selected_times_default = []
-        self.selected_times_vertical = []
+        self.loader_thread = None
+        self.thumbnail_policy = ThumbnailPolicy.from_env()
+
+    @property
+    def selected_times_default(self):
+        return self.thumbnail_model.selected_minutes(DEFAULT_ROLE)
+
+    @property
+    def selected_times_vertical(self):
+        return self.thumbnail_model.selected_minutes(VERTICAL_ROLE)
     
     def setup_ui(self):
         """Configura a interface do usuário com otimizações específicas da plataforma"""
@@ -349,27 +435,31 @@ class VideoSegmenterApp(QMainWindow):
         """)
         preview_layout.addWidget(preview_label)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setFrameShape(QFrame.Shape.NoFrame)
-        
-        # Estilo de scroll area adaptado para macOS
+        # Grade virtualizada: só os tiles visíveis são desenhados pelo delegate
+        self.thumbnail_model = ThumbnailListModel(self)
+        self.thumbnail_view = QListView()
+        self.thumbnail_view.setModel(self.thumbnail_model)
+        thumbnail_delegate = ThumbnailDelegate(self.thumbnail_view)
+        thumbnail_delegate.detail_requested.connect(self.show_minute_detail)
+        self.thumbnail_view.setItemDelegate(thumbnail_delegate)
+        self.thumbnail_view.setViewMode(QListView.ViewMode.IconMode)
+        self.thumbnail_view.setFlow(QListView.Flow.LeftToRight)
+        self.thumbnail_view.setWrapping(True)
+        self.thumbnail_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.thumbnail_view.setMovement(QListView.Movement.Static)
+        self.thumbnail_view.setUniformItemSizes(True)
+        self.thumbnail_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.thumbnail_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.thumbnail_view.setFrameShape(QFrame.Shape.NoFrame)
+        
+        # Estilo da área de miniaturas adaptado para macOS
         if is_macos():
             scroll_style = "background-color: #1e1e1e; border-radius: 10px;"
         else:
             scroll_style = "background-color: #252525; border-radius: 8px;"
         
-        self.scroll_area.setStyleSheet(scroll_style)
-        
-        self.scroll_content = QWidget()
-        self.scroll_content.setStyleSheet(scroll_style)
-        self.grid_layout = QGridLayout(self.scroll_content)
-        self.grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
-        self.grid_layout.setSpacing(15)  # Aumentado de 10 para 15 para melhor espaçamento
-        self.grid_layout.setContentsMargins(25, 25, 25, 25)  # Aumentado de 20 para 25
-        
-        self.scroll_area.setWidget(self.scroll_content)
-        preview_layout.addWidget(self.scroll_area, 1)
+        self.thumbnail_view.setStyleSheet(f"QListView {{ {scroll_style} }}")
+        preview_layout.addWidget(self.thumbnail_view, 1)
         
         main_layout.addLayout(preview_layout, 1)
 
@@ -563,55 +653,34 @@ class VideoSegmenterApp(QMainWindow):
     
     def select_all_default(self):
         """Seleciona todos os checkboxes default"""
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if isinstance(widget, ThumbnailWidget):
-                widget.default_check.setChecked(True)
+        self.thumbnail_model.set_all(DEFAULT_ROLE, True)
     
     def select_all_vertical(self):
         """Seleciona todos os checkboxes vertical"""
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if isinstance(widget, ThumbnailWidget):
-                widget.vertical_check.setChecked(True)
+        self.thumbnail_model.set_all(VERTICAL_ROLE, True)
     
     def clear_selection(self):
         """Limpa todas as seleções"""
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if isinstance(widget, ThumbnailWidget):
-                widget.default_check.setChecked(False)
-                widget.vertical_check.setChecked(False)
+        self.thumbnail_model.set_all(DEFAULT_ROLE, False)
+        self.thumbnail_model.set_all(VERTICAL_ROLE, False)
     
     def adjust_columns(self):
-        width = self.scroll_content.width()
-        # Calcular colunas baseado no tamanho fixo dos widgets (350px + espaçamento)
-        widget_width = 350 + 15  # largura do widget + espaçamento
-        available_width = width - 50  # descontar margens
+        width = self.thumbnail_view.viewport().width()
+        # Calcular colunas baseado no tamanho fixo dos tiles (350px + espaçamento)
+        tile_width = ThumbnailDelegate.TILE_SIZE.width() + 15  # largura do tile + espaçamento
         
         # Calcular número ideal de colunas
-        ideal_columns = max(1, available_width // widget_width)
+        ideal_columns = max(1, width // tile_width)
         
         # Limitar a 4 colunas máximo conforme solicitado
         new_columns = min(4, ideal_columns)
         
-        if new_columns != self.columns:
+        # As células da grade dividem a largura disponível entre as colunas
+        cell_width = max(tile_width, width // new_columns)
+        grid_size = QSize(cell_width, ThumbnailDelegate.TILE_SIZE.height() + 15)
+        if new_columns != self.columns or grid_size != self.thumbnail_view.gridSize():
             self.columns = new_columns
-            self.update_grid_layout()
-    
-    def update_grid_layout(self):
-        widgets = []
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget:
-                widgets.append(widget)
-                widget.hide()
-        
-        for i, widget in enumerate(reversed(widgets)):
-            row = i // self.columns
-            col = i % self.columns
-            self.grid_layout.addWidget(widget, row, col)
-            widget.show()
+            self.thumbnail_view.setGridSize(grid_size)
     
     def upload_video(self):
         """Abre diálogo para selecionar vídeo"""
@@ -636,8 +705,21 @@ class VideoSegmenterApp(QMainWindow):
         else:
             self.progress_bar.setStyleSheet("background-color: #0047AB;")
 
-        self.loader_thread = FrameLoaderThread(file_path)
-        self.loader_thread.frames_loaded.connect(self.display_preview_frames)
+        # Um vídeo novo descarta as miniaturas que ainda chegariam do anterior
+        previous_thread = self.loader_thread
+        if previous_thread is not None and previous_thread.isRunning():
+            previous_thread.requestInterruption()
+            previous_thread.frame_ready.disconnect()
+            previous_thread.loading_finished.disconnect()
+            previous_thread.progress_updated.disconnect()
+            # Com um pai Qt a thread sobrevive até terminar e então é descartada
+            previous_thread.setParent(self)
+            previous_thread.finished.connect(previous_thread.deleteLater)
+        self.clear_preview_frames()
+
+        self.loader_thread = FrameLoaderThread(file_path, self.thumbnail_policy)
+        self.loader_thread.frame_ready.connect(self.display_preview_frame)
+        self.loader_thread.loading_finished.connect(self.finish_preview_frames)
         self.loader_thread.progress_updated.connect(self.update_progress)
         self.loader_thread.start()
     
@@ -645,17 +727,45 @@ class VideoSegmenterApp(QMainWindow):
         """Atualiza progresso do carregamento"""
         self.status_label.setText(f"Loading video... {progress}%")
     
-    def display_preview_frames(self, frames, frame_times):
-        self.selected_times_default = []
-        self.selected_times_vertical = []
+    def show_minute_detail(self, minute):
+        """Abre os quadros detalhados de um minuto, decodificados só agora"""
+        if not self.file_path:
+            return
+        start = minute * MINUTE_INTERVAL
+        dialog = DetailStripDialog(f"Minute {minute + 1} - {os.path.basename(self.file_path)}", self)
 
-        # Limpar widgets existentes
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-        
-        if not frames:
+        # A thread pertence à janela principal: sobrevive ao fechamento do diálogo até terminar
+        thread = DetailLoaderThread(
+            self.file_path, start, start + MINUTE_INTERVAL,
+            self.thumbnail_policy.detail_interval, self
+        )
+        thread.frame_ready.connect(dialog.add_frame)
+        thread.finished.connect(thread.deleteLater)
+        dialog.finished.connect(thread.requestInterruption)
+        thread.start()
+        dialog.show()
+
+    def clear_preview_frames(self):
+        # Limpa miniaturas e seleções
+        self.thumbnail_model.clear()
+
+    def display_preview_frame(self, idx, frame, frame_time):
+        """Adiciona uma miniatura à grade assim que ela é decodificada"""
+        minutes = int(frame_time // 60)
+        seconds = int(frame_time % 60)
+        time_str = f"{minutes:02d}:{seconds:02d}"
+
+        height, width, channel = frame.shape
+        bytes_per_line = frame.strides[0]
+        # QImage usa o buffer do numpy sem copiar; fromImage faz a única cópia, para o pixmap
+        qimage = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        pixmap = QPixmap.fromImage(qimage)
+        # Otimização para displays de alta densidade (Retina)
+        pixmap.setDevicePixelRatio(self.config.ui_scaling)
+        self.thumbnail_model.append_thumbnail(pixmap, time_str)
+
+    def finish_preview_frames(self, count):
+        if not count:
             self.status_label.setText("Failed to load video")
             if is_macos():
                 self.progress_bar.setStyleSheet("background-color: #FF3B30; border-radius: 2px;")
@@ -663,19 +773,8 @@ class VideoSegmenterApp(QMainWindow):
                 self.progress_bar.setStyleSheet("background-color: #d32f2f;")
             self.upload_btn.setEnabled(True)
             return
-
-        # Criar thumbnails
-        for idx, frame in enumerate(frames):
-            minutes = int(frame_times[idx] // 60)
-            seconds = int(frame_times[idx] % 60)
-            time_str = f"{minutes:02d}:{seconds:02d}"
-
-            thumbnail = ThumbnailWidget(frame, idx, time_str, self)
-            row = idx // self.columns
-            col = idx % self.columns
-            self.grid_layout.addWidget(thumbnail, row, col)
         
-        self.status_label.setText(f"Loaded {len(frames)} frames from video")
+        self.status_label.setText(f"Loaded {count} frames from video")
         if is_macos():
             self.progress_bar.setStyleSheet("background-color: #34C759; border-radius: 2px;")
         else:
@@ -687,7 +786,7 @@ class VideoSegmenterApp(QMainWindow):
         if self.config.native_features.get('notification_center') and hasattr(self, 'tray_icon'):
             self.tray_icon.showMessage(
                 "Segmentor",
-                f"Video loaded successfully! {len(frames)} frames ready for processing.",
+                f"Video loaded successfully! {count} frames ready for processing.",
                 QSystemTrayIcon.MessageIcon.Information,
                 3000
             )
@@ -741,6 +840,8 @@ class VideoSegmenterApp(QMainWindow):
 
 def main():
     """Função principal com configurações específicas da plataforma"""
+    # Necessário para o pool de processos das miniaturas no executável empacotado
+    multiprocessing.freeze_support()
     config = get_platform_config()
     
     # Configurações de ambiente específicas da plataforma
@@ -1,16 +1,31 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import shutil
 import subprocess
 import uuid
-import zipfile
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 from pydantic import BaseModel
 from datetime import datetime
-import json
+import re
 import asyncio
+import contextvars
+import functools
+import hashlib
+import tempfile
+import threading
+from email.utils import formatdate
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from probe_utils import can_stream_copy, find_keyframe_before
+from queue_store import QueueStore, QueueState
+from scheduler import JobScheduler
+from upload_sessions import UploadSessionManager
+from blob_store import BlobStore
+from encoder_slots import EncoderSlots
+from zip_stream import ZipStream
+from queue_events import ConnectionManager, ProgressThrottle, QueueEventLog
 
 app = FastAPI(title="Video Segmenter API")
 
@@ -25,29 +40,54 @@ app.add_middleware(
 
 # Configurações
 UPLOAD_DIR = "uploads"
-QUEUE_FILE = "queue.json"
+QUEUE_FILE = "queue.json"  # formato legado, importado uma única vez para o banco
+QUEUE_DB = "queue.db"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")  # vídeos deduplicados por SHA-256
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# WebSocket connections manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+blobs = BlobStore(BLOB_DIR)
+# Serializa a entrada de blobs na fila com a remoção do último item que os usa:
+# sem ele, um blob reaproveitado pelo ingest poderia ser apagado antes do enqueue
+blob_refs_lock = asyncio.Lock()
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.add(websocket)
+store = QueueStore(QUEUE_DB)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# Execução do FFmpeg fora do event loop: sessões NVENC simultâneas são limitadas
+ENCODE_WORKERS = int(os.environ.get("SEGMENTOR_ENCODE_WORKERS", "3"))
+encode_executor = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="ffmpeg")
+# O executor conta tarefas; um minuto default+vertical no mesmo FFmpeg abre duas sessões
+encoder_slots = EncoderSlots(ENCODE_WORKERS)
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+# Jobs executados em paralelo pelo agendador
+JOB_WORKERS = int(os.environ.get("SEGMENTOR_JOB_WORKERS", str(ENCODE_WORKERS)))
 
-manager = ConnectionManager()
+# Processos FFmpeg ativos por job, para cancelamento
+current_job: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_job", default=None)
+active_processes: Dict[str, Set[subprocess.Popen]] = {}
+cancelled_jobs: Set[str] = set()
+processes_lock = threading.Lock()
+
+# Callback de progresso do FFmpeg em execução: recebe os segundos já gravados na saída
+ffmpeg_progress: contextvars.ContextVar[Optional[Callable[[float], None]]] = contextvars.ContextVar(
+    "ffmpeg_progress", default=None
+)
+
+async def run_in_encoder(func, *args, **kwargs):
+    """Executa uma função bloqueante (FFmpeg, I/O de arquivos) no executor de codificação"""
+    loop = asyncio.get_running_loop()
+    # Copiar o contexto para que o FFmpeg iniciado na thread saiba a qual job pertence
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        encode_executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+def kill_job_processes(item_id: str) -> None:
+    """Encerra os processos FFmpeg do job e impede que novos sejam iniciados"""
+    with processes_lock:
+        cancelled_jobs.add(item_id)
+        processes = list(active_processes.get(item_id, ()))
+    for process in processes:
+        process.kill()
 
 # Modelos
 class QueueItem(BaseModel):
@@ -60,6 +100,9 @@ class QueueItem(BaseModel):
     result: Optional[Dict[str, str]] = None
     createdAt: str
     updatedAt: str
+    fastCut: bool = False
+    priority: int = 0
+    blobDigest: Optional[str] = None
 
     def dict(self, *args, **kwargs):
         return {
@@ -71,34 +114,63 @@ class QueueItem(BaseModel):
             "error": self.error,
             "result": self.result,
             "createdAt": self.createdAt,
-            "updatedAt": self.updatedAt
+            "updatedAt": self.updatedAt,
+            "fastCut": self.fastCut,
+            "priority": self.priority,
+            "blobDigest": self.blobDigest
         }
 
-# Gerenciamento da Fila
-def load_queue() -> Dict[str, QueueItem]:
-    if os.path.exists(QUEUE_FILE):
-        with open(QUEUE_FILE, 'r') as f:
-            data = json.load(f)
-            return {k: QueueItem(**v) for k, v in data.items()}
-    return {}
+# Gerenciamento da Fila: estado em memória, persistido em segundo plano no SQLite
+queue_state = QueueState(store, QueueItem)
+
+@app.on_event("startup")
+async def load_queue_state():
+    store.import_json(QUEUE_FILE)
+    queue_state.load()
+    queue_state.start()
+    # Uploads abandonados antes do último desligamento
+    upload_sessions.expire()
+    await scheduler.start()
+
+@app.on_event("shutdown")
+async def flush_queue_state():
+    await scheduler.stop()
+    await manager.close()
+    await queue_state.stop()
+
+def get_item(item_id: str) -> Optional[QueueItem]:
+    return queue_state.get(item_id)
+
+def list_items(status: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> List[QueueItem]:
+    items = [item for item in queue_state.values() if status is None or item.status == status]
+    return items[offset:offset + limit] if limit is not None else items[offset:]
+
+async def save_item(item: QueueItem):
+    await queue_state.put(item)
+
+# Eventos incrementais da fila: um snapshot na conexão e depois apenas os itens alterados
+event_log = QueueEventLog()
+
+def queue_snapshot() -> dict:
+    return event_log.snapshot([item.dict() for item in list_items()])
+
+# Cada conexão tem sua própria fila de envio; publicar nunca espera pelos clientes
+manager = ConnectionManager(queue_snapshot)
+
+async def publish_event(event: dict):
+    manager.broadcast(event_log.append(event))
 
-def save_queue(queue: Dict[str, QueueItem]):
-    with open(QUEUE_FILE, 'w') as f:
-        json.dump({k: v.dict() for k, v in queue.items()}, f, indent=2)
+async def broadcast_item_updated(item: QueueItem):
+    await publish_event({"type": "item_updated", "id": item.id, "item": item.dict()})
 
-async def broadcast_queue_update(queue: Dict[str, QueueItem]):
-    await manager.broadcast({
-        "type": "queue_update",
-        "items": [item.dict() for item in queue.values()]
-    })
+async def broadcast_item_removed(item_id: str):
+    await publish_event({"type": "item_removed", "id": item_id})
 
 # Função refatorada de segmentação (sem GUI)
-def extract_segment(input_video: str, output_path: str, start_time: float, duration: float, vertical: bool = False) -> None:
-    ffmpeg_cmd = [
-        'ffmpeg',
-        '-ss', str(start_time),
-        '-i', input_video,
-        '-t', str(duration),
+VERTICAL_FILTER = "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920"
+
+def encoding_args() -> List[str]:
+    return [
         '-c:v', 'h264_nvenc',
         '-preset', 'p7',
         '-cq', '20',
@@ -106,33 +178,175 @@ def extract_segment(input_video: str, output_path: str, start_time: float, durat
         '-rc', 'vbr_hq',
         '-bf', '4',
     ]
-    if vertical:
-        ffmpeg_cmd += [
-            '-vf', "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920"
-        ]
-    ffmpeg_cmd += [
+
+def audio_args() -> List[str]:
+    return [
         '-c:a', 'aac',
         '-b:a', '128k',
         '-movflags', '+faststart',
+    ]
+
+def run_ffmpeg(ffmpeg_cmd: List[str]) -> None:
+    job_id = current_job.get()
+    on_progress = ffmpeg_progress.get()
+    if on_progress is not None:
+        # Relatório chave=valor no stdout em vez das estatísticas no stderr
+        ffmpeg_cmd = [ffmpeg_cmd[0], '-progress', 'pipe:1', '-nostats'] + ffmpeg_cmd[1:]
+
+    # stderr em arquivo temporário: não bloqueia o FFmpeg enquanto lemos o stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        with processes_lock:
+            if job_id in cancelled_jobs:
+                raise RuntimeError("Job cancelado")
+            process = subprocess.Popen(
+                ffmpeg_cmd,
+                stdout=subprocess.PIPE if on_progress is not None else subprocess.DEVNULL,
+                stderr=stderr_file
+            )
+            active_processes.setdefault(job_id, set()).add(process)
+        try:
+            if on_progress is not None:
+                for line in process.stdout:
+                    key, _, value = line.strip().partition(b'=')
+                    if key == b'out_time_us':
+                        try:
+                            on_progress(int(value) / 1_000_000)
+                        except ValueError:
+                            pass  # "N/A" antes do primeiro quadro
+            process.wait()
+        finally:
+            if process.stdout:
+                process.stdout.close()
+            with processes_lock:
+                active_processes[job_id].discard(process)
+                if not active_processes[job_id]:
+                    del active_processes[job_id]
+        if process.returncode != 0:
+            stderr_file.seek(0)
+            raise RuntimeError(f"FFmpeg falhou: {stderr_file.read().decode(errors='replace')}")
+
+def extract_segment(input_video: str, output_path: str, start_time: float, duration: float, vertical: bool = False, fast_cut: bool = False) -> None:
+    # fast_cut já vem verificado (can_stream_copy) uma vez por item em process_video
+    if fast_cut and not vertical:
+        # Corte rápido: cópia do stream a partir do keyframe anterior ao início
+        keyframe_time = find_keyframe_before(input_video, start_time)
+        run_ffmpeg([
+            'ffmpeg',
+            '-ss', str(keyframe_time),
+            '-i', input_video,
+            '-t', str(start_time + duration - keyframe_time),
+            '-map', '0:v:0', '-map', '0:a?',
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            '-movflags', '+faststart',
+            '-y', output_path
+        ])
+        return
+
+    ffmpeg_cmd = [
+        'ffmpeg',
+        '-ss', str(start_time),
+        '-i', input_video,
+        '-t', str(duration),
+    ] + encoding_args()
+    if vertical:
+        ffmpeg_cmd += [
+            '-vf', VERTICAL_FILTER
+        ]
+    ffmpeg_cmd += audio_args() + [
         '-y',
         output_path
     ]
-    result = subprocess.run(ffmpeg_cmd, capture_output=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"FFmpeg falhou: {result.stderr.decode()}")
+    run_ffmpeg(ffmpeg_cmd)
 
-async def process_video(item_id: str, background_tasks: BackgroundTasks):
-    queue = load_queue()
-    if item_id not in queue:
+def extract_segment_dual(input_video: str, default_output: str, vertical_output: str, start_time: float, duration: float) -> None:
+    """Gera as saídas default e vertical do mesmo trecho com um único decode (filtro split)."""
+    ffmpeg_cmd = [
+        'ffmpeg',
+        '-ss', str(start_time),
+        '-t', str(duration),
+        '-i', input_video,
+        '-filter_complex', f"[0:v]split=2[vdefault][vsource];[vsource]{VERTICAL_FILTER}[vvertical]",
+        '-map', '[vdefault]', '-map', '0:a?',
+    ] + encoding_args() + audio_args() + [
+        '-y', default_output,
+        '-map', '[vvertical]', '-map', '0:a?',
+    ] + encoding_args() + audio_args() + [
+        '-y', vertical_output,
+    ]
+    run_ffmpeg(ffmpeg_cmd)
+
+PARTIAL_SUFFIX = ".part"
+OUTPUT_NAME_PATTERN = re.compile(r"_seg_(\d+)_(default|vertical)\.mp4$")
+
+def get_video_path(item: QueueItem) -> str:
+    """Vídeo de entrada do item: blob deduplicado ou arquivo na pasta do item (legado)"""
+    if item.blobDigest:
+        return blobs.path_for(item.blobDigest)
+    return os.path.join(UPLOAD_DIR, item.id, item.fileName)
+
+def extract_minute(video_path: str, output_folder: str, base: str, minute: int,
+                   default: bool, vertical: bool, fast_cut: bool = False) -> None:
+    """Gera as saídas selecionadas de um minuto (executado no encode_executor)."""
+    start = minute * 60
+    duration = 60
+    out_def = os.path.join(output_folder, f"{base}_seg_{minute+1}_default.mp4")
+    out_vert = os.path.join(output_folder, f"{base}_seg_{minute+1}_vertical.mp4")
+    # Gravar em arquivos parciais: a saída só aparece na listagem quando estiver completa
+    part_def, part_vert = partial_path(out_def), partial_path(out_vert)
+    if default and vertical and not fast_cut:
+        with encoder_slots.hold(2):
+            extract_segment_dual(video_path, part_def, part_vert, start, duration)
+    else:
+        passes = []
+        if default:
+            passes.append(functools.partial(
+                extract_segment, video_path, part_def, start, duration, vertical=False, fast_cut=fast_cut
+            ))
+        if vertical:
+            passes.append(functools.partial(extract_segment, video_path, part_vert, start, duration, vertical=True))
+        on_progress = ffmpeg_progress.get()
+        for index, run_pass in enumerate(passes):
+            if on_progress is not None:
+                # Passagens sequenciais dividem o progresso do minuto entre si
+                ffmpeg_progress.set(
+                    lambda seconds, index=index: on_progress((index * duration + seconds) / len(passes))
+                )
+            with encoder_slots.hold(1):
+                run_pass()
+    if default:
+        os.replace(part_def, out_def)
+    if vertical:
+        os.replace(part_vert, out_vert)
+
+def partial_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}{PARTIAL_SUFFIX}{ext}"
+
+def list_output_files(item_id: str) -> List[str]:
+    """Saídas concluídas de um item, em ordem de nome"""
+    output_folder = os.path.join(UPLOAD_DIR, item_id, "output")
+    if not os.path.isdir(output_folder):
+        return []
+    return [
+        fname for fname in sorted(os.listdir(output_folder))
+        if not os.path.splitext(fname)[0].endswith(PARTIAL_SUFFIX)
+        and os.path.isfile(os.path.join(output_folder, fname))
+    ]
+
+async def process_video(item_id: str):
+    item = get_item(item_id)
+    if item is None:
         return
 
-    item = queue[item_id]
+    current_job.set(item_id)
+    with processes_lock:
+        cancelled_jobs.discard(item_id)
+
     item.status = "processing"
     item.updatedAt = datetime.now().isoformat()
-    save_queue(queue)
-    
-    # Broadcast queue update
-    await broadcast_queue_update(queue)
+    await save_item(item)
+    await broadcast_item_updated(item)
 
     try:
         # Parse dos índices
@@ -143,55 +357,97 @@ async def process_video(item_id: str, background_tasks: BackgroundTasks):
         work_dir = os.path.join(UPLOAD_DIR, item_id)
         os.makedirs(work_dir, exist_ok=True)
 
-        video_path = os.path.join(work_dir, item.fileName)
+        video_path = get_video_path(item)
         output_folder = os.path.join(work_dir, "output")
         os.makedirs(output_folder, exist_ok=True)
 
         all_idxs = set(default_idxs + vertical_idxs)
         base = os.path.splitext(item.fileName)[0]
+        # Com corte rápido os segmentos default não passam pelo decode compartilhado
+        fast_cut = item.fastCut and await run_in_encoder(can_stream_copy, video_path)
         total_segments = len(all_idxs)
         processed_segments = 0
 
+        # Progresso fino a partir do -progress do FFmpeg, publicado com limite de frequência
+        loop = asyncio.get_running_loop()
+        throttle = ProgressThrottle()
+        publish_tasks = set()
+
+        async def publish_progress():
+            item.updatedAt = datetime.now().isoformat()
+            await save_item(item)
+            await broadcast_item_updated(item)
+
+        def update_progress(segment_index: int, seconds: float):
+            progress = (segment_index + min(seconds / 60, 1.0)) / total_segments * 100
+            if item.status != "processing" or progress <= item.progress:
+                return
+            item.progress = progress
+            if throttle.should_publish(progress):
+                task = asyncio.create_task(publish_progress())
+                publish_tasks.add(task)
+                task.add_done_callback(publish_tasks.discard)
+
+        def report_progress(segment_index: int, seconds: float):
+            # Chamado na thread do FFmpeg: repassar ao event loop
+            loop.call_soon_threadsafe(update_progress, segment_index, seconds)
+
         for minute in all_idxs:
-            start = minute * 60
-            duration = 60
-            if minute in default_idxs:
-                out_def = os.path.join(output_folder, f"{base}_seg_{minute+1}_default.mp4")
-                extract_segment(video_path, out_def, start, duration, vertical=False)
-            if minute in vertical_idxs:
-                out_vert = os.path.join(output_folder, f"{base}_seg_{minute+1}_vertical.mp4")
-                extract_segment(video_path, out_vert, start, duration, vertical=True)
+            ffmpeg_progress.set(functools.partial(report_progress, processed_segments))
+            await run_in_encoder(
+                extract_minute, video_path, output_folder, base, minute,
+                minute in default_idxs, minute in vertical_idxs, fast_cut
+            )
             
             processed_segments += 1
             item.progress = (processed_segments / total_segments) * 100
-            item.updatedAt = datetime.now().isoformat()
-            save_queue(queue)
-            await broadcast_queue_update(queue)
-
-        # Empacota tudo em um ZIP para download
-        zip_path = os.path.join(work_dir, f"{base}_segments.zip")
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for fname in os.listdir(output_folder):
-                zipf.write(os.path.join(output_folder, fname), arcname=fname)
+            throttle.should_publish(item.progress, force=True)
+            await publish_progress()
 
+        # O ZIP é montado sob demanda no download, sem cópia extra em disco
         item.status = "completed"
         item.result = {
             "downloadUrl": f"/download/{item_id}",
             "fileName": f"{base}_segments.zip"
         }
+    except asyncio.CancelledError:
+        # Cancelamento ou desligamento: encerrar o FFmpeg que ainda roda no executor
+        kill_job_processes(item_id)
+        raise
     except Exception as e:
         item.status = "failed"
         item.error = str(e)
     finally:
         item.updatedAt = datetime.now().isoformat()
-        save_queue(queue)
-        await broadcast_queue_update(queue)
+        await save_item(item)
+        await broadcast_item_updated(item)
+
+scheduler = JobScheduler(queue_state, process_video, max_workers=JOB_WORKERS,
+                         on_change=broadcast_item_updated)
+
+def copy_and_hash(source, dest_path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(dest_path, "wb") as buffer:
+        while True:
+            block = source.read(1024 * 1024)
+            if not block:
+                break
+            hasher.update(block)
+            buffer.write(block)
+    return hasher.hexdigest()
+
+def write_and_hash(f, chunk: bytes, hasher) -> None:
+    if hasher is not None:
+        hasher.update(chunk)
+    f.write(chunk)
 
 @app.post("/upload/")
 async def upload_video(
     file: UploadFile = File(...),
-    defaults: str = Form(""),   # índices de minutos separados por vírgula
-    verticals: str = Form("")   # índices de minutos separados por vírgula
+    defaults: str = Form(""),     # índices de minutos separados por vírgula
+    verticals: str = Form(""),    # índices de minutos separados por vírgula
+    fastCut: bool = Form(False),  # copiar segmentos default sem recodificar
+    priority: int = Form(0)       # maior prioridade é processada primeiro
 ):
     try:
         # Parse dos índices
@@ -201,115 +457,417 @@ async def upload_video(
         # Criar ID único para o item
         item_id = str(uuid.uuid4())
         
-        # Salvar arquivo
+        # Salvar arquivo calculando o SHA-256 durante a cópia
         file_path = os.path.join(UPLOAD_DIR, item_id, file.filename)
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Criar item na fila
-        now = datetime.now().isoformat()
-        item = QueueItem(
-            id=item_id,
-            fileName=file.filename,
-            status="pending",
-            progress=0,
-            selectedMinutes={
-                "default": default_idxs,
-                "vertical": vertical_idxs
-            },
-            createdAt=now,
-            updatedAt=now
-        )
-
-        queue = load_queue()
-        queue[item_id] = item
-        save_queue(queue)
-        
-        # Broadcast queue update
-        await broadcast_queue_update(queue)
+        loop = asyncio.get_running_loop()
+        digest = await loop.run_in_executor(None, copy_and_hash, file.file, file_path)
+        async with blob_refs_lock:
+            # Conteúdo já conhecido: a cópia recebida é descartada
+            await loop.run_in_executor(None, blobs.ingest, file_path, digest)
+            await enqueue_item(item_id, file.filename, default_idxs, vertical_idxs, fastCut, priority,
+                               blob_digest=digest)
 
         return {"id": item_id, "status": "pending"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Upload retomável em partes: criar sessão, enviar faixas de bytes (PUT) e finalizar
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+upload_sessions = UploadSessionManager(UPLOAD_DIR)
+upload_sessions_lock = asyncio.Lock()
+
+class UploadSessionRequest(BaseModel):
+    fileName: str
+    size: int
+    defaults: List[int] = []
+    verticals: List[int] = []
+    fastCut: bool = False
+    priority: int = 0
+
+def parse_content_range(header: Optional[str], size: int) -> tuple:
+    """Interpreta 'bytes início-fim/total' e retorna a faixa [início, fim)"""
+    try:
+        unit, _, spec = header.partition(" ")
+        byte_range, _, total = spec.partition("/")
+        start, _, end = byte_range.partition("-")
+        start, end = int(start), int(end) + 1
+    except (AttributeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid Content-Range header")
+    if unit != "bytes" or start < 0 or end <= start or end > size or (total not in ("*", str(size))):
+        raise HTTPException(status_code=416, detail="Content-Range outside of upload size")
+    return start, end
+
+async def enqueue_item(item_id: str, file_name: str, default_idxs: List[int], vertical_idxs: List[int],
+                       fast_cut: bool = False, priority: int = 0, blob_digest: Optional[str] = None) -> QueueItem:
+    now = datetime.now().isoformat()
+    item = QueueItem(
+        id=item_id,
+        fileName=file_name,
+        status="pending",
+        progress=0,
+        selectedMinutes={
+            "default": default_idxs,
+            "vertical": vertical_idxs
+        },
+        createdAt=now,
+        updatedAt=now,
+        fastCut=fast_cut,
+        priority=priority,
+        blobDigest=blob_digest
+    )
+
+    await save_item(item)
+    scheduler.wake()
+    await broadcast_item_updated(item)
+    return item
+
+def get_upload_session(session_id: str):
+    session = upload_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+@app.post("/uploads/")
+async def create_upload_session(request: UploadSessionRequest):
+    try:
+        session = upload_sessions.create(request.fileName, request.size, {
+            "defaults": request.defaults,
+            "verticals": request.verticals,
+            "fastCut": request.fastCut,
+            "priority": request.priority
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**session.to_response(), "chunkSize": UPLOAD_CHUNK_SIZE}
+
+@app.get("/uploads/{session_id}")
+async def get_upload_status(session_id: str):
+    return get_upload_session(session_id).to_response()
+
+@app.put("/uploads/{session_id}")
+async def upload_chunk(session_id: str, request: Request):
+    session = get_upload_session(session_id)
+    start, end = parse_content_range(request.headers.get("content-range"), session.size)
+
+    # Gravar o corpo direto no arquivo de destino, sem arquivo temporário intermediário
+    loop = asyncio.get_running_loop()
+    offset = start
+    # Faixas recebidas em sequência alimentam o SHA-256 incremental
+    hasher = upload_sessions.claim_hasher(session, start)
+    with open(upload_sessions.file_path(session), "r+b") as f:
+        f.seek(start)
+        try:
+            async for chunk in request.stream():
+                if offset + len(chunk) > end:
+                    raise HTTPException(status_code=400, detail="Chunk larger than Content-Range")
+                await loop.run_in_executor(None, write_and_hash, f, chunk, hasher)
+                offset += len(chunk)
+        finally:
+            if hasher is not None:
+                upload_sessions.release_hasher(session, offset, hasher)
+            # Mesmo numa conexão interrompida, o que foi gravado fica registrado para retomada
+            await loop.run_in_executor(None, f.flush)
+            async with upload_sessions_lock:
+                session.add_range(start, offset)
+                upload_sessions.save(session)
+
+    if offset != end:
+        raise HTTPException(status_code=400, detail="Chunk shorter than Content-Range")
+    return session.to_response()
+
+@app.post("/uploads/{session_id}/finalize")
+async def finalize_upload(session_id: str):
+    session = get_upload_session(session_id)
+    if not session.is_complete:
+        raise HTTPException(status_code=409, detail="Upload is incomplete")
+
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(None, upload_sessions.digest, session)
+    metadata = session.metadata
+    async with blob_refs_lock:
+        await loop.run_in_executor(None, blobs.ingest, upload_sessions.file_path(session), digest)
+        upload_sessions.close(session)
+        await enqueue_item(
+            session.id, session.fileName,
+            metadata.get("defaults", []), metadata.get("verticals", []),
+            metadata.get("fastCut", False), metadata.get("priority", 0),
+            blob_digest=digest
+        )
+    return {"id": session.id, "status": "pending", "sha256": digest}
+
+# Deduplicação: clientes que já conhecem o SHA-256 do vídeo podem pular o upload
+class BlobQueueRequest(BaseModel):
+    sha256: str
+    fileName: str
+    defaults: List[int] = []
+    verticals: List[int] = []
+    fastCut: bool = False
+    priority: int = 0
+
+@app.get("/blobs/{digest}")
+async def get_blob(digest: str):
+    if not blobs.exists(digest):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    return {"sha256": digest, "size": blobs.size(digest)}
+
+@app.post("/queue/from-blob")
+async def enqueue_from_blob(request: BlobQueueRequest):
+    item_id = str(uuid.uuid4())
+    async with blob_refs_lock:
+        if not blobs.exists(request.sha256):
+            raise HTTPException(status_code=404, detail="Blob not found")
+        await enqueue_item(
+            item_id, os.path.basename(request.fileName), request.defaults, request.verticals,
+            request.fastCut, request.priority, blob_digest=request.sha256
+        )
+    return {"id": item_id, "status": "pending"}
+
+@app.delete("/uploads/{session_id}")
+async def abort_upload(session_id: str):
+    session = get_upload_session(session_id)
+    upload_sessions.close(session)
+    shutil.rmtree(upload_sessions.work_dir(session.id), ignore_errors=True)
+    return {"status": "aborted"}
+
 @app.get("/queue/")
-async def get_queue():
-    queue = load_queue()
-    return list(queue.values())
+async def get_queue(
+    response: Response,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+):
+    # Total de itens (com o filtro aplicado) para paginação no cliente
+    response.headers["X-Total-Count"] = str(len(list_items(status)))
+    return list_items(status, limit, offset)
 
 @app.get("/queue/{item_id}")
 async def get_queue_item(item_id: str):
-    queue = load_queue()
-    if item_id not in queue:
+    item = get_item(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    return queue[item_id]
+    return item
 
 @app.post("/queue/{item_id}/process")
-async def process_queue_item(item_id: str, background_tasks: BackgroundTasks):
-    queue = load_queue()
-    if item_id not in queue:
+async def process_queue_item(item_id: str):
+    item = get_item(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item = queue[item_id]
     if item.status != "pending":
         raise HTTPException(status_code=400, detail="Item is not pending")
     
-    background_tasks.add_task(process_video, item_id, background_tasks)
-    return {"status": "processing"}
+    # O agendador já drena a fila; aqui o item só passa à frente dos demais
+    item.priority = max(other.priority for other in queue_state.values()) + 1
+    item.updatedAt = datetime.now().isoformat()
+    await save_item(item)
+    scheduler.wake()
+    return {"status": "scheduled"}
+
+@app.post("/queue/{item_id}/cancel")
+async def cancel_queue_item(item_id: str):
+    if get_item(item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    if not await scheduler.cancel(item_id):
+        raise HTTPException(status_code=400, detail="Item is not pending or processing")
+    return {"status": "cancelled"}
 
 @app.delete("/queue/{item_id}")
 async def delete_queue_item(item_id: str):
-    queue = load_queue()
-    if item_id not in queue:
+    if get_item(item_id) is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
+    # Interromper o processamento antes de remover os arquivos
+    if scheduler.is_running(item_id):
+        await scheduler.cancel(item_id)
+    
     # Remover arquivos
     work_dir = os.path.join(UPLOAD_DIR, item_id)
     if os.path.exists(work_dir):
         shutil.rmtree(work_dir)
     
-    # Remover da fila
-    del queue[item_id]
-    save_queue(queue)
+    async with blob_refs_lock:
+        # Remover da fila
+        item = await queue_state.remove(item_id)
+
+        # Remover o vídeo deduplicado quando nenhum outro item o utiliza
+        if item and item.blobDigest and not any(
+            other.blobDigest == item.blobDigest for other in queue_state.values()
+        ):
+            blobs.remove(item.blobDigest)
     
-    # Broadcast queue update
-    await broadcast_queue_update(queue)
+    await broadcast_item_removed(item_id)
     
     return {"status": "deleted"}
 
 @app.get("/download/{item_id}")
 async def download_result(item_id: str):
-    queue = load_queue()
-    if item_id not in queue:
+    item = get_item(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item = queue[item_id]
     if item.status != "completed" or not item.result:
         raise HTTPException(status_code=400, detail="Item is not completed")
     
-    work_dir = os.path.join(UPLOAD_DIR, item_id)
-    zip_path = os.path.join(work_dir, item.result["fileName"])
-    
-    if not os.path.exists(zip_path):
+    output_folder = os.path.join(UPLOAD_DIR, item_id, "output")
+    if not os.path.isdir(output_folder):
         raise HTTPException(status_code=404, detail="Result file not found")
-    
-    return FileResponse(zip_path, filename=item.result["fileName"])
+
+    # ZIP sem compressão gerado durante o envio: os MP4 já são comprimidos
+    files = [(fname, os.path.join(output_folder, fname)) for fname in list_output_files(item_id)]
+    archive = ZipStream(files)
+    return StreamingResponse(
+        iter(archive),
+        media_type="application/zip",
+        headers={
+            "Content-Length": str(archive.content_length),
+            "Content-Disposition": content_disposition("attachment", item.result["fileName"])
+        }
+    )
+
+def content_disposition(disposition_type: str, file_name: str) -> str:
+    """Mesma codificação do FileResponse para nomes com acentos"""
+    quoted_name = quote(file_name)
+    if quoted_name != file_name:
+        return f"{disposition_type}; filename*=utf-8''{quoted_name}"
+    return f'{disposition_type}; filename="{file_name}"'
+
+# Saídas individuais: listagem e download por arquivo com suporte a Range
+OUTPUT_CHUNK_SIZE = 1024 * 1024
+RANGE_SPEC_PATTERN = re.compile(r"([0-9]*)-([0-9]*)")
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+def parse_range_header(header: str, size: int) -> Optional[tuple]:
+    """Interpreta 'bytes=início-fim' e retorna a faixa [início, fim)
+
+    Retorna None quando o header deve ser ignorado (sintaxe inválida, fim
+    antes do início ou múltiplas faixas), o que leva a uma resposta 200 com o
+    arquivo inteiro. Só um início além do fim do arquivo resulta em 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    match = RANGE_SPEC_PATTERN.fullmatch(spec.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if start == "":
+        # Faixa de sufixo: últimos N bytes (N = 0 não é satisfazível)
+        suffix_length = int(end)
+        start = max(size - suffix_length, 0) if suffix_length > 0 else size
+        end = size
+    else:
+        start = int(start)
+        if end and int(end) < start:
+            # Último byte antes do primeiro: faixa inválida, não insatisfazível (RFC 9110)
+            return None
+        end = min(int(end) + 1, size) if end else size
+    if start >= size:
+        raise HTTPException(
+            status_code=416, detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def iter_file_range(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(OUTPUT_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+@app.get("/queue/{item_id}/outputs")
+async def list_outputs(item_id: str):
+    """Saídas já concluídas de um item (disponíveis durante o processamento)"""
+    if get_item(item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    output_folder = os.path.join(UPLOAD_DIR, item_id, "output")
+    outputs = []
+    for fname in list_output_files(item_id):
+        stat = os.stat(os.path.join(output_folder, fname))
+        match = OUTPUT_NAME_PATTERN.search(fname)
+        outputs.append({
+            "fileName": fname,
+            "size": stat.st_size,
+            "minute": int(match.group(1)) - 1 if match else None,
+            "kind": match.group(2) if match else None,
+            "etag": file_etag(stat),
+            "downloadUrl": f"/download/{item_id}/{quote(fname)}"
+        })
+    return outputs
+
+@app.get("/download/{item_id}/{file_name}")
+async def download_output(item_id: str, file_name: str, request: Request):
+    if get_item(item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    # Apenas nomes listados: evita acesso fora da pasta de saída e a arquivos parciais
+    if file_name not in list_output_files(item_id):
+        raise HTTPException(status_code=404, detail="Output not found")
+
+    path = os.path.join(UPLOAD_DIR, item_id, "output", file_name)
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Accept-Ranges": "bytes"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()
+                for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range: só retoma se o arquivo não mudou desde a primeira parte
+    if range_header and (if_range is None or if_range.strip() in (etag, last_modified)):
+        byte_range = parse_range_header(range_header, stat.st_size)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{stat.st_size}"
+            headers["Content-Length"] = str(end - start)
+            return StreamingResponse(
+                iter_file_range(path, start, end), status_code=206,
+                media_type="video/mp4", headers=headers
+            )
+
+    if range_header:
+        # Range ignorado (inválido, múltiplas faixas ou If-Range desatualizado).
+        # O FileResponse interpretaria o header de novo (400 ou multipart), então
+        # o arquivo inteiro é enviado aqui
+        headers["Content-Length"] = str(stat.st_size)
+        headers["Content-Disposition"] = content_disposition("inline", file_name)
+        return StreamingResponse(
+            iter_file_range(path, 0, stat.st_size), media_type="video/mp4", headers=headers
+        )
+
+    # Arquivo inteiro: FileResponse usa sendfile quando o servidor suporta
+    return FileResponse(
+        path, media_type="video/mp4", filename=file_name,
+        headers=headers, stat_result=stat, content_disposition_type="inline"
+    )
 
 @app.websocket("/ws/queue")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, since: Optional[int] = None, epoch: Optional[str] = None):
+    await websocket.accept()
+    # Reconexão: reenviar só o que o cliente perdeu; caso contrário, snapshot completo
+    missed = event_log.since(since, epoch) if since is not None else None
+    connection = manager.connect(websocket, missed)
     try:
-        # Send initial queue state
-        queue = load_queue()
-        await websocket.send_json({
-            "type": "queue_update",
-            "items": [item.dict() for item in queue.values()]
-        })
-        
         # Keep connection alive and handle disconnection
         while True:
             await websocket.receive_text()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
\ No newline at end of file
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: a conexão foi fechada pelo servidor (cliente removido por lentidão)
+        pass
+    finally:
+        manager.disconnect(connection)
\ No newline at end of file
@@ -1,8 +1,14 @@
+import json
+import multiprocessing
 import platform
+import re
+import shutil
 import subprocess
 import sys
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -22,11 +28,52 @@ class PlatformConfig:
     ui_scaling: float
     native_features: Dict[str, bool]
 
+def get_user_cache_dir() -> str:
+    """Diretório de cache do usuário no local padrão de cada sistema (criado se não existir)"""
+    if platform.system() == "Darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+        cache_dir = os.path.join(base, "Segmentor")
+    elif platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        cache_dir = os.path.join(base, "Segmentor", "Cache")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base, "segmentor")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+# Cache da sondagem da plataforma (encoders do FFmpeg, CPU, escala da tela)
+PROBE_CACHE_FILE = "platform_probe.json"
+PROBE_CACHE_VERSION = 1
+# Após esse tempo o cache ainda é usado, mas é atualizado em segundo plano
+PROBE_MAX_AGE = 24 * 3600
+PROBE_TIMEOUT = 30
+ENCODER_PATTERN = re.compile(r"^\s*[VAS][A-Z.]{5}\s+(\S+)", re.MULTILINE)
+
+def parse_encoders(output: str) -> List[str]:
+    """Nomes de todos os encoders listados por `ffmpeg -encoders`"""
+    # A legenda antes da linha "------" não lista encoders
+    _, separator, listing = output.partition("------")
+    return ENCODER_PATTERN.findall(listing if separator else output)
+
 class PlatformDetector:
-    """Detector de plataforma com otimizações específicas para macOS/Apple Silicon"""
+    """Detector de plataforma com otimizações específicas para macOS/Apple Silicon
+
+    Os resultados dos subprocessos (`ffmpeg -encoders`, `sysctl` e
+    `system_profiler`) ficam em um arquivo no cache do usuário, associado ao
+    caminho e ao mtime do binário do FFmpeg. A inicialização só lê esse
+    arquivo; se ele não existir, estiver desatualizado ou antigo, a sondagem
+    roda em segundo plano (só no processo principal) e a configuração é
+    substituída quando ela termina. Até lá são usados valores conservadores
+    (encoder de software).
+    """
     
     def __init__(self):
         self._config: Optional[PlatformConfig] = None
+        self._probe: Dict[str, Any] = {}
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+        self._load_probe()
         self._detect_platform()
     
     def _detect_platform(self) -> None:
@@ -40,21 +87,27 @@ class PlatformDetector:
         is_windows = system == 'windows'
         is_linux = system == 'linux'
         
+        # Os ajustes abaixo nunca consideraram Apple Silicon/macOS: a seleção de
+        # encoder, threads e memória continua igual à das versões anteriores
+        tuned_apple_silicon = False
+        tuned_macos = False
+        
         # Configurar aceleração de hardware baseada na plataforma
-        ffmpeg_hwaccel, video_encoder = self._get_hardware_acceleration()
+        ffmpeg_hwaccel, video_encoder = self._get_hardware_acceleration(tuned_apple_silicon, tuned_macos)
         
         # Configurar número de threads otimizado
-        thread_count = self._get_optimal_thread_count()
+        thread_count = self._get_optimal_thread_count(tuned_apple_silicon)
         
         # Configurar otimizações de memória
-        memory_optimization = self._get_memory_optimization()
+        memory_optimization = self._get_memory_optimization(tuned_apple_silicon)
         
         # Configurar escala de UI
         ui_scaling = self._get_ui_scaling()
         
         # Configurar recursos nativos
-        native_features = self._get_native_features()
+        native_features = self._get_native_features(tuned_apple_silicon)
         
+        # Substituição atômica: leitores veem a configuração antiga ou a nova
         self._config = PlatformConfig(
             os_name=system,
             architecture=machine,
@@ -71,113 +124,168 @@ class PlatformDetector:
             native_features=native_features
         )
     
-    def _is_apple_silicon(self) -> bool:
-        """Detecta se está rodando em Apple Silicon (M1/M2/M3/M4)"""
-        if platform.system() != 'Darwin':
-            return False
+    def _probe_key(self) -> Dict[str, Any]:
+        """Identifica o ambiente sondado: mudou o FFmpeg ou a máquina, a sondagem é refeita"""
+        ffmpeg_path = shutil.which('ffmpeg')
+        ffmpeg_mtime = None
+        if ffmpeg_path:
+            try:
+                ffmpeg_mtime = os.stat(ffmpeg_path).st_mtime_ns
+            except OSError:
+                ffmpeg_path = None
+        return {
+            'version': PROBE_CACHE_VERSION,
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'ffmpeg': ffmpeg_path,
+            'ffmpeg_mtime': ffmpeg_mtime
+        }
+    
+    def _probe_cache_path(self) -> str:
+        return os.path.join(get_user_cache_dir(), PROBE_CACHE_FILE)
+    
+    def _load_probe(self) -> None:
+        """Usa a sondagem em cache e agenda uma nova se ela não servir mais"""
+        key = self._probe_key()
+        try:
+            with open(self._probe_cache_path(), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        
+        if isinstance(cached, dict) and cached.get('key') == key and isinstance(cached.get('probe'), dict):
+            self._probe = cached['probe']
+            if time.time() - cached.get('probed_at', 0) < PROBE_MAX_AGE:
+                return
+        # Processos filhos (ex.: pool de miniaturas) usam o que houver em cache;
+        # só o processo principal sonda, senão cada worker repetiria a sondagem
+        if multiprocessing.parent_process() is not None:
+            return
+        self.refresh(key)
+    
+    def refresh(self, key: Optional[Dict[str, Any]] = None) -> threading.Thread:
+        """Refaz a sondagem em segundo plano e atualiza o cache; retorna a thread em execução"""
+        with self._refresh_lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh, args=(key or self._probe_key(),), daemon=True
+                )
+                self._refresh_thread.start()
+            return self._refresh_thread
+    
+    def _refresh(self, key: Dict[str, Any]) -> None:
+        probe = self._run_probe(key)
+        self._probe = probe
+        self._detect_platform()
         
+        # Sondagem com falha (timeout, erro) vale só para esta execução: gravá-la
+        # fixaria o encoder de software até o cache expirar
+        if not self._probe_succeeded(key, probe):
+            return
+        try:
+            path = self._probe_cache_path()
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'probed_at': time.time(), 'probe': self._probe}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    
+    def _run_probe(self, key: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa os subprocessos lentos da detecção, cada um uma única vez"""
+        probe: Dict[str, Any] = {'encoders': None}
+        if key['ffmpeg']:
+            try:
+                result = subprocess.run(
+                    [key['ffmpeg'], '-hide_banner', '-encoders'],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=PROBE_TIMEOUT
+                )
+                probe['encoders'] = parse_encoders(result.stdout)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+                pass
+        
+        if platform.system() == 'Darwin':
+            probe['cpu_brand'] = self._run_text(['sysctl', '-n', 'machdep.cpu.brand_string'])
+            probe['displays'] = self._run_text(['system_profiler', 'SPDisplaysDataType'])
+        return probe
+    
+    @staticmethod
+    def _probe_succeeded(key: Dict[str, Any], probe: Dict[str, Any]) -> bool:
+        if key['ffmpeg'] and probe.get('encoders') is None:
+            return False
+        # Chaves ausentes (fora do macOS) não contam como falha
+        return probe.get('cpu_brand', '') is not None and probe.get('displays', '') is not None
+    
+    @staticmethod
+    def _run_text(command: List[str]) -> Optional[str]:
         try:
-            # Verificar através do sysctl
             result = subprocess.run(
-                ['sysctl', '-n', 'machdep.cpu.brand_string'],
+                command,
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                timeout=PROBE_TIMEOUT
             )
-            cpu_brand = result.stdout.strip().lower()
+            return result.stdout
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+            return None
+    
+    def _is_apple_silicon(self) -> bool:
+        """Detecta se está rodando em Apple Silicon (M1/M2/M3/M4)"""
+        if platform.system() != 'Darwin':
+            return False
+        
+        cpu_brand = self._probe.get('cpu_brand')
+        if cpu_brand:
+            # Verificar através do sysctl
+            cpu_brand = cpu_brand.strip().lower()
             
             # Verificar se é Apple Silicon
             apple_silicon_indicators = ['apple m1', 'apple m2', 'apple m3', 'apple m4']
             return any(indicator in cpu_brand for indicator in apple_silicon_indicators)
         
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Fallback: verificar arquitetura
-            machine = platform.machine().lower()
-            return machine in ['arm64', 'aarch64']
+        # Fallback: verificar arquitetura
+        machine = platform.machine().lower()
+        return machine in ['arm64', 'aarch64']
     
-    def _get_hardware_acceleration(self) -> tuple[str, str]:
+    def _get_hardware_acceleration(self, is_apple_silicon: bool, is_macos: bool) -> tuple[str, str]:
         """Retorna a configuração de aceleração de hardware apropriada"""
-        if self._config and self._config.is_apple_silicon:
+        if is_apple_silicon:
             # Apple Silicon: usar VideoToolbox
             return 'videotoolbox', 'h264_videotoolbox'
-        elif self._config and self._config.is_macos:
+        elif is_macos:
             # macOS Intel: usar VideoToolbox quando disponível
-            if self._check_videotoolbox_support():
+            if self._has_encoder('h264_videotoolbox'):
                 return 'videotoolbox', 'h264_videotoolbox'
             else:
                 return 'auto', 'libx264'
         elif platform.system().lower() == 'windows':
             # Windows: tentar NVENC, depois DXVA2, fallback para software
-            if self._check_nvenc_support():
+            if self._has_encoder('h264_nvenc'):
                 return 'cuda', 'h264_nvenc'
-            elif self._check_dxva2_support():
+            elif self._has_encoder('h264_qsv'):
                 return 'dxva2', 'h264_qsv'
             else:
                 return 'auto', 'libx264'
         else:
             # Linux e outros: tentar VAAPI, depois software
-            if self._check_vaapi_support():
+            if self._has_encoder('h264_vaapi'):
                 return 'vaapi', 'h264_vaapi'
             else:
                 return 'auto', 'libx264'
     
-    def _check_videotoolbox_support(self) -> bool:
-        """Verifica se VideoToolbox está disponível"""
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-hide_banner', '-encoders'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return 'h264_videotoolbox' in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-    
-    def _check_nvenc_support(self) -> bool:
-        """Verifica se NVENC está disponível"""
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-hide_banner', '-encoders'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return 'h264_nvenc' in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-    
-    def _check_dxva2_support(self) -> bool:
-        """Verifica se DXVA2/QSV está disponível"""
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-hide_banner', '-encoders'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return 'h264_qsv' in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-    
-    def _check_vaapi_support(self) -> bool:
-        """Verifica se VAAPI está disponível"""
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-hide_banner', '-encoders'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return 'h264_vaapi' in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+    def _has_encoder(self, name: str) -> bool:
+        """Verifica se o FFmpeg sondado oferece o encoder (sem sondagem: não)"""
+        return name in (self._probe.get('encoders') or ())
     
-    def _get_optimal_thread_count(self) -> int:
+    def _get_optimal_thread_count(self, is_apple_silicon: bool) -> int:
         """Retorna o número otimizado de threads para a plataforma"""
         cpu_count = os.cpu_count() or 4
         
-        if self._config and self._config.is_apple_silicon:
+        if is_apple_silicon:
             # Apple Silicon: usar todos os cores de performance + metade dos efficiency
             # Aproximação: usar 75% dos cores disponíveis
             return max(4, int(cpu_count * 0.75))
@@ -188,9 +296,9 @@ class PlatformDetector:
             # Windows/Linux: usar 90% dos cores
             return max(2, int(cpu_count * 0.9))
     
-    def _get_memory_optimization(self) -> Dict[str, Any]:
+    def _get_memory_optimization(self, is_apple_silicon: bool) -> Dict[str, Any]:
         """Retorna configurações de otimização de memória"""
-        if self._config and self._config.is_apple_silicon:
+        if is_apple_silicon:
             return {
                 'buffer_size': '64M',
                 'max_muxing_queue_size': 1024,
@@ -214,27 +322,19 @@ class PlatformDetector:
     
     def _get_ui_scaling(self) -> float:
         """Retorna o fator de escala da UI apropriado"""
-        if platform.system().lower() == 'darwin':
-            try:
-                # Detectar densidade de pixels no macOS
-                result = subprocess.run(
-                    ['system_profiler', 'SPDisplaysDataType'],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                if 'Retina' in result.stdout or '5K' in result.stdout or '6K' in result.stdout:
-                    return 2.0
-                elif '4K' in result.stdout:
-                    return 1.5
-                else:
-                    return 1.0
-            except (subprocess.CalledProcessError, FileNotFoundError):
+        displays = self._probe.get('displays')
+        if platform.system().lower() == 'darwin' and displays:
+            # Detectar densidade de pixels no macOS
+            if 'Retina' in displays or '5K' in displays or '6K' in displays:
+                return 2.0
+            elif '4K' in displays:
+                return 1.5
+            else:
                 return 1.0
         else:
             return 1.0
     
-    def _get_native_features(self) -> Dict[str, bool]:
+    def _get_native_features(self, is_apple_silicon: bool) -> Dict[str, bool]:
         """Retorna recursos nativos disponíveis por plataforma"""
         if platform.system().lower() == 'darwin':
             return {
@@ -243,7 +343,7 @@ class PlatformDetector:
                 'drag_and_drop': True,
                 'dark_mode_detection': True,
                 'window_transparency': True,
-                'metal_rendering': self._config.is_apple_silicon if self._config else False,
+                'metal_rendering': is_apple_silicon,
                 'spotlight_integration': True,
                 'quick_look': True
             }
@@ -295,8 +395,20 @@ class PlatformDetector:
         
         return args
     
-    def get_encoding_args(self, vertical: bool = False) -> list[str]:
-        """Retorna argumentos de codificação otimizados"""
+    def get_vertical_filter(self) -> str:
+        """Retorna o filtro de recorte/escala usado nos segmentos verticais"""
+        if self.config.is_apple_silicon:
+            # Usar Metal para processamento no Apple Silicon
+            return "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920:flags=lanczos"
+        return "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920"
+
+    def get_encoding_args(self, vertical: bool = False, include_filter: bool = True, faststart: bool = True) -> list[str]:
+        """Retorna argumentos de codificação otimizados
+
+        Com include_filter=False o filtro vertical não é adicionado, para uso
+        com saídas alimentadas por um -filter_complex. Com faststart=False o
+        -movflags fica a cargo do chamador (ex.: muxer de segmentos).
+        """
         config = self.config
         args = []
         
@@ -331,21 +443,36 @@ class PlatformDetector:
             ])
         
         # Configurar filtros de vídeo
-        if vertical:
-            if config.is_apple_silicon:
-                # Usar Metal para processamento no Apple Silicon
-                args.extend(['-vf', "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920:flags=lanczos"])
-            else:
-                args.extend(['-vf', "crop=ih*(9/16):ih:(iw-ih*(9/16))/2:0,scale=1080:1920"])
+        if vertical and include_filter:
+            args.extend(['-vf', self.get_vertical_filter()])
         
         # Configurar áudio
         args.extend(['-c:a', config.audio_encoder, '-b:a', '256k'])
         
         # Otimizações de streaming
-        args.extend(['-movflags', '+faststart'])
+        if faststart:
+            args.extend(['-movflags', '+faststart'])
         
         return args
 
+    def get_max_parallel_jobs(self) -> int:
+        """Retorna quantos processos FFmpeg podem rodar em paralelo sem saturar o encoder"""
+        config = self.config
+
+        if config.video_encoder == 'h264_nvenc':
+            # GPUs de consumo limitam o número de sessões NVENC simultâneas
+            return 3
+        elif config.video_encoder in ('h264_videotoolbox', 'h264_qsv', 'h264_vaapi'):
+            # Encoders de hardware possuem poucos engines de mídia
+            return 2
+        else:
+            # libx264 já usa várias threads por processo: ~4 threads por job
+            return max(1, config.thread_count // 4)
+
+    def get_threads_per_job(self, parallel_jobs: int) -> int:
+        """Divide as threads disponíveis entre os jobs executados em paralelo"""
+        return max(1, self.config.thread_count // max(1, parallel_jobs))
+
 # Instância global do detector
 platform_detector = PlatformDetector()
 
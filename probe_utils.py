@@ -0,0 +1,185 @@
+import bisect
+import json
+import os
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Codecs que podem ser copiados sem recodificação para um contêiner MP4
+MP4_COPY_VIDEO_CODECS = ('h264', 'hevc')
+MP4_COPY_AUDIO_CODECS = ('aac', 'mp3')
+# Contêineres de origem com timestamps confiáveis para corte por cópia
+COPY_SOURCE_FORMATS = ('mov', 'mp4', 'matroska')
+# Índice de keyframes salvo ao lado do vídeo: <video>.keyframes.json
+KEYFRAME_INDEX_SUFFIX = '.keyframes.json'
+KEYFRAME_INDEX_VERSION = 1
+
+# Índices em memória por caminho, incluindo falhas (lista vazia) para não reindexar
+_keyframe_indexes: Dict[str, Tuple[Dict[str, Any], List[float]]] = {}
+# Um lock por arquivo: indexar um vídeo não bloqueia consultas aos demais
+_keyframe_index_locks: Dict[str, threading.Lock] = {}
+_keyframe_index_locks_guard = threading.Lock()
+
+def probe_streams(input_video: str) -> Optional[Dict[str, Any]]:
+    """Retorna streams e formato do arquivo via ffprobe (None se não for possível analisar)"""
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-show_entries', 'stream=index,codec_type,codec_name:format=format_name,duration',
+                '-of', 'json',
+                input_video
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=60
+        )
+        return json.loads(result.stdout)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError, ValueError):
+        return None
+
+def probe_video_stream(input_video: str) -> Optional[Dict[str, Any]]:
+    """Retorna parâmetros do primeiro stream de vídeo (codec, perfil, pix_fmt, timebase...)"""
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'v:0',
+                '-show_entries', 'stream=codec_name,profile,level,pix_fmt,width,height,time_base,r_frame_rate',
+                '-of', 'json',
+                input_video
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=60
+        )
+        streams = json.loads(result.stdout).get('streams', [])
+        return streams[0] if streams else None
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError, ValueError):
+        return None
+
+def can_stream_copy(input_video: str) -> bool:
+    """Verifica se o vídeo pode ser cortado com -c copy para um MP4"""
+    info = probe_streams(input_video)
+    if not info:
+        return False
+
+    format_names = info.get('format', {}).get('format_name', '').split(',')
+    if not any(name in COPY_SOURCE_FORMATS for name in format_names):
+        return False
+
+    streams = info.get('streams', [])
+    video_codecs = [s.get('codec_name') for s in streams if s.get('codec_type') == 'video']
+    audio_codecs = [s.get('codec_name') for s in streams if s.get('codec_type') == 'audio']
+
+    if not video_codecs or video_codecs[0] not in MP4_COPY_VIDEO_CODECS:
+        return False
+    return all(codec in MP4_COPY_AUDIO_CODECS for codec in audio_codecs)
+
+def list_keyframes(input_video: str, start_time: float = 0, end_time: Optional[float] = None) -> List[float]:
+    """Lista os timestamps dos keyframes de vídeo em um intervalo, lendo apenas pacotes (sem decodificar)"""
+    read_interval = f"{max(0.0, start_time)}%{end_time if end_time is not None else ''}"
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'v:0',
+                '-read_intervals', read_interval,
+                '-show_entries', 'packet=pts_time,flags',
+                '-of', 'csv=p=0',
+                input_video
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            # Indexar o arquivo inteiro lê todos os pacotes: dar mais tempo
+            timeout=120 if end_time is not None else 900
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+def _keyframe_index_key(input_video: str) -> Dict[str, Any]:
+    stat = os.stat(input_video)
+    return {
+        'version': KEYFRAME_INDEX_VERSION,
+        'path': os.path.abspath(input_video),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+def get_keyframe_index(input_video: str) -> List[float]:
+    """Retorna todos os keyframes do vídeo, usando o índice em cache quando válido
+
+    O índice é construído uma vez por arquivo (uma passada só de demux pelo
+    ffprobe) e salvo em <video>.keyframes.json, identificado por caminho,
+    tamanho e mtime. Uma lista vazia indica que não foi possível indexar; a
+    falha também fica em cache até o arquivo mudar.
+    """
+    try:
+        key = _keyframe_index_key(input_video)
+    except OSError:
+        return []
+
+    with _keyframe_index_locks_guard:
+        lock = _keyframe_index_locks.setdefault(key['path'], threading.Lock())
+
+    with lock:
+        cached = _keyframe_indexes.get(key['path'])
+        if cached and cached[0] == key:
+            return cached[1]
+
+        index_path = input_video + KEYFRAME_INDEX_SUFFIX
+        keyframes = None
+        try:
+            with open(index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('key') == key:
+                keyframes = data.get('keyframes', [])
+        except (OSError, ValueError):
+            pass
+
+        if keyframes is None:
+            keyframes = list_keyframes(input_video)
+            if keyframes:
+                # Escrita atômica; falhas (ex.: pasta somente leitura) mantêm só o cache em memória
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp_path, 'w') as f:
+                        json.dump({'key': key, 'keyframes': keyframes}, f)
+                    os.replace(tmp_path, index_path)
+                except OSError:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+        _keyframe_indexes[key['path']] = (key, keyframes)
+        return keyframes
+
+def keyframes_between(input_video: str, start_time: float, end_time: float) -> List[float]:
+    """Keyframes dentro de [start_time, end_time]"""
+    keyframes = get_keyframe_index(input_video)
+    if not keyframes:
+        return [kf for kf in list_keyframes(input_video, start_time, end_time) if start_time <= kf <= end_time]
+    return keyframes[bisect.bisect_left(keyframes, start_time):bisect.bisect_right(keyframes, end_time)]
+
+def find_keyframe_before(input_video: str, time: float) -> float:
+    """Retorna o último keyframe em ou antes de `time` (ou o próprio `time` se não houver índice)"""
+    keyframes = get_keyframe_index(input_video)
+    if keyframes:
+        position = bisect.bisect_right(keyframes, time + 0.001)
+        return keyframes[position - 1] if position else time
+
+    # Sem índice: o ffprobe posiciona a leitura no keyframe anterior ao início
+    # do intervalo, então uma janela curta basta mesmo para GOPs longos
+    keyframes = [kf for kf in list_keyframes(input_video, time - 10, time + 0.001) if kf <= time + 0.001]
+    return keyframes[-1] if keyframes else time
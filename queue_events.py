@@ -0,0 +1,158 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Set
+
+class QueueEventLog:
+    """Log circular dos eventos da fila enviados pelo WebSocket
+
+    Cada evento recebe um número de sequência crescente. Clientes que
+    reconectam informam a última sequência vista e recebem só os eventos
+    seguintes, enquanto eles ainda estiverem no log. O `epoch` muda a cada
+    inicialização do servidor, invalidando sequências de uma execução anterior.
+    """
+
+    def __init__(self, max_events: int = 1000):
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self._events = deque(maxlen=max_events)
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        self.seq += 1
+        message = dict(event, seq=self.seq)
+        self._events.append(message)
+        return message
+
+    def snapshot(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"type": "snapshot", "epoch": self.epoch, "seq": self.seq, "items": items}
+
+    def since(self, seq: int, epoch: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Eventos posteriores a `seq`, ou None se for preciso um novo snapshot"""
+        if epoch != self.epoch or seq > self.seq or seq < 0:
+            return None
+        if seq == self.seq:
+            return []
+        if not self._events or self._events[0]["seq"] > seq + 1:
+            return None
+        return [event for event in self._events if event["seq"] > seq]
+
+class ProgressThrottle:
+    """Limita a publicação de progresso de um job
+
+    Um novo valor só é publicado quando avançou pelo menos `min_delta` pontos
+    percentuais e já se passaram `min_interval` segundos desde a última
+    publicação. Marcos importantes (fim de um segmento) usam `force`.
+    """
+
+    def __init__(self, min_interval: float = 0.5, min_delta: float = 1.0):
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self._last_value = 0.0
+        self._last_time = float("-inf")
+
+    def should_publish(self, value: float, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and (
+            value - self._last_value < self.min_delta or now - self._last_time < self.min_interval
+        ):
+            return False
+        self._last_value = value
+        self._last_time = now
+        return True
+
+class ClientConnection:
+    """Fila de envio limitada de um cliente WebSocket, drenada por uma tarefa própria
+
+    Eventos pendentes do mesmo item são fundidos: só o estado mais recente é
+    enviado. Se a fila estourar, ela é descartada e o cliente recebe um novo
+    snapshot em vez dos eventos perdidos.
+    """
+
+    def __init__(self, websocket, snapshot_factory: Callable[[], Dict[str, Any]],
+                 max_pending: int, send_timeout: float):
+        self.websocket = websocket
+        self.snapshot_factory = snapshot_factory
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.task: Optional[asyncio.Task] = None
+        self._pending: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._needs_snapshot = False
+        self._ready = asyncio.Event()
+
+    def enqueue(self, message: Dict[str, Any]) -> None:
+        if self._needs_snapshot:
+            # O snapshot é montado no envio e já inclui este evento
+            return
+        key = message.get("id", ("seq", message.get("seq")))
+        # Reinserir no fim mantém a ordem de envio igual à ordem de sequência
+        self._pending.pop(key, None)
+        self._pending[key] = message
+        if len(self._pending) > self.max_pending:
+            self.request_snapshot()
+        self._ready.set()
+
+    def request_snapshot(self) -> None:
+        self._pending.clear()
+        self._needs_snapshot = True
+        self._ready.set()
+
+    async def run(self, on_failure: Callable[["ClientConnection"], None]) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                if self._needs_snapshot:
+                    self._needs_snapshot = False
+                    message = self.snapshot_factory()
+                elif self._pending:
+                    _, message = self._pending.popitem(last=False)
+                else:
+                    self._ready.clear()
+                    continue
+                await asyncio.wait_for(self.websocket.send_json(message), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Cliente travado ou desconectado: sai da lista e a conexão é fechada
+            on_failure(self)
+            try:
+                await asyncio.wait_for(self.websocket.close(code=1013), self.send_timeout)
+            except Exception:
+                pass
+
+class ConnectionManager:
+    """Distribui eventos para todos os clientes sem que um cliente lento atrase os demais"""
+
+    def __init__(self, snapshot_factory: Callable[[], Dict[str, Any]],
+                 max_pending: int = 256, send_timeout: float = 10.0):
+        self.snapshot_factory = snapshot_factory
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.active_connections: Set[ClientConnection] = set()
+
+    def connect(self, websocket, missed: Optional[List[Dict[str, Any]]] = None) -> ClientConnection:
+        """Registra o cliente; sem `missed` ele começa com um snapshot"""
+        connection = ClientConnection(websocket, self.snapshot_factory, self.max_pending, self.send_timeout)
+        if missed is None:
+            connection.request_snapshot()
+        else:
+            for message in missed:
+                connection.enqueue(message)
+        connection.task = asyncio.create_task(connection.run(self.active_connections.discard))
+        self.active_connections.add(connection)
+        return connection
+
+    def disconnect(self, connection: ClientConnection) -> None:
+        self.active_connections.discard(connection)
+        if connection.task is not None:
+            connection.task.cancel()
+
+    def broadcast(self, message: Dict[str, Any]) -> None:
+        for connection in list(self.active_connections):
+            connection.enqueue(message)
+
+    async def close(self) -> None:
+        connections = list(self.active_connections)
+        for connection in connections:
+            self.disconnect(connection)
+        await asyncio.gather(*(c.task for c in connections if c.task), return_exceptions=True)
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+class QueueStore:
+    """Armazenamento transacional da fila de processamento em SQLite (modo WAL)
+
+    Cada item é guardado como JSON na coluna `data`, com id, status e datas
+    replicados em colunas. Leituras e filtros são feitos no QueueState em
+    memória; o banco só é lido na inicialização.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS queue_items (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_queue_items_created ON queue_items (created_at)"
+        )
+
+    @staticmethod
+    def _row_values(item: Dict[str, Any]) -> tuple:
+        return (item["id"], item["status"], item["createdAt"], item["updatedAt"], json.dumps(item))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Lista todos os itens em ordem de criação (carga inicial do estado em memória)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM queue_items ORDER BY created_at, id").fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def write_batch(self, items: Iterable[Dict[str, Any]], deleted_ids: Iterable[str]) -> None:
+        """Grava inserções/atualizações e remoções em uma única transação"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO queue_items (id, status, created_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [self._row_values(item) for item in items]
+                )
+                self._conn.executemany(
+                    "DELETE FROM queue_items WHERE id = ?",
+                    [(item_id,) for item_id in deleted_ids]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def import_json(self, json_path: str) -> int:
+        """Importa uma única vez o queue.json legado; o arquivo é renomeado para *.imported"""
+        if not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+
+        items = list(data.values())
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Itens já existentes no banco prevalecem sobre o JSON
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO queue_items (id, status, created_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [self._row_values(item) for item in items]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        os.replace(json_path, json_path + ".imported")
+        return len(items)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class QueueState:
+    """Estado autoritativo da fila em memória com persistência write-behind
+
+    Carregado uma vez do QueueStore na inicialização; alterações são feitas
+    sob `lock` e gravadas em lote por uma tarefa em segundo plano, depois de
+    `flush_delay` segundos sem novas alterações (ou no máximo `max_delay`).
+    """
+
+    def __init__(self, store: QueueStore, item_factory: Callable[..., Any],
+                 flush_delay: float = 0.5, max_delay: float = 5.0):
+        self.store = store
+        self.item_factory = item_factory
+        self.flush_delay = flush_delay
+        self.max_delay = max_delay
+        self.lock = asyncio.Lock()
+        self._items: Dict[str, Any] = {}
+        self._dirty: set = set()
+        self._deleted: set = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def load(self) -> None:
+        self._items = {data["id"]: self.item_factory(**data) for data in self.store.list()}
+
+    def start(self) -> None:
+        self._changed = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # Leituras: consultas em memória
+    def get(self, item_id: str) -> Optional[Any]:
+        return self._items.get(item_id)
+
+    def values(self) -> List[Any]:
+        return list(self._items.values())
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # Escritas: memória imediatamente, disco em segundo plano
+    async def put(self, item: Any) -> None:
+        async with self.lock:
+            self._items[item.id] = item
+            self._mark_dirty(item.id)
+
+    async def remove(self, item_id: str) -> Optional[Any]:
+        async with self.lock:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                self._dirty.discard(item_id)
+                self._deleted.add(item_id)
+                self._notify()
+            return item
+
+    def _mark_dirty(self, item_id: str) -> None:
+        self._deleted.discard(item_id)
+        self._dirty.add(item_id)
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+
+    async def flush(self) -> None:
+        """Grava imediatamente as alterações pendentes"""
+        async with self.lock:
+            items = [self._items[item_id].dict() for item_id in self._dirty if item_id in self._items]
+            deleted = list(self._deleted)
+            self._dirty.clear()
+            self._deleted.clear()
+        if not items and not deleted:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.store.write_batch, items, deleted)
+        except Exception as e:
+            # Reagendar para a próxima gravação sem sobrescrever alterações mais novas
+            print(f"Erro ao gravar a fila: {e}")
+            async with self.lock:
+                for item in items:
+                    if item["id"] in self._items and item["id"] not in self._deleted:
+                        self._dirty.add(item["id"])
+                self._deleted.update(item_id for item_id in deleted if item_id not in self._items)
+                self._notify()
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._changed.wait()
+            # Debounce: aguardar um intervalo sem alterações, limitado a max_delay
+            deadline = loop.time() + self.max_delay
+            while True:
+                self._changed.clear()
+                timeout = min(self.flush_delay, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            self._changed.clear()
+            await self.flush()
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from queue_store import QueueState
+
+class JobScheduler:
+    """Agendador que drena automaticamente os itens pendentes da fila
+
+    Executa até `max_workers` jobs simultâneos, escolhendo o próximo item por
+    prioridade (maior primeiro) e depois por ordem de chegada. Itens que
+    estavam em processamento quando o servidor parou voltam para a fila.
+    """
+
+    def __init__(self, state: QueueState, runner: Callable[[str], Awaitable[None]],
+                 max_workers: int = 1,
+                 on_change: Optional[Callable[[Any], Awaitable[None]]] = None):
+        self.state = state
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.on_change = on_change
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Recupera jobs interrompidos e inicia o laço de agendamento"""
+        for item in self.state.values():
+            if item.status == "processing":
+                item.status = "pending"
+                item.progress = 0
+                await self.state.put(item)
+
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._schedule_loop())
+        self.wake()
+
+    async def stop(self) -> None:
+        """Interrompe o agendador; jobs em execução serão retomados na próxima inicialização"""
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self) -> None:
+        """Sinaliza que há itens novos (ou vagas livres) para agendar"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def is_running(self, item_id: str) -> bool:
+        return item_id in self._running
+
+    async def cancel(self, item_id: str) -> bool:
+        """Cancela um item pendente ou em execução; retorna False se não for cancelável"""
+        item = self.state.get(item_id)
+        if item is None or item.status not in ("pending", "processing"):
+            return False
+
+        task = self._running.get(item_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # O job pode ter terminado antes de o cancelamento chegar: saídas completas ficam
+            if item.status not in ("pending", "processing"):
+                return False
+
+        item.status = "cancelled"
+        await self.state.put(item)
+        if self.on_change:
+            await self.on_change(item)
+        return True
+
+    def _next_pending(self):
+        pending = [
+            item for item in self.state.values()
+            if item.status == "pending" and item.id not in self._running
+        ]
+        if not pending:
+            return None
+        return min(pending, key=lambda item: (-item.priority, item.createdAt))
+
+    async def _schedule_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while len(self._running) < self.max_workers:
+                item = self._next_pending()
+                if item is None:
+                    break
+                task = asyncio.create_task(self.runner(item.id))
+                self._running[item.id] = task
+                task.add_done_callback(lambda _, item_id=item.id: self._job_finished(item_id))
+
+    def _job_finished(self, item_id: str) -> None:
+        self._running.pop(item_id, None)
+        self.wake()
@@ -22,7 +22,11 @@ hidden_imports = [
     'PIL',
     'PIL.Image',
     'platform_utils',
-    'video_utils'
+    'video_utils',
+    'probe_utils',
+    'encoder_slots',
+    'thumbnail_utils',
+    'thumbnail_cache'
 ]
 
 a = Analysis(
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Testes da área de vídeos deduplicados por SHA-256
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from blob_store import BlobStore, hash_file
+
+CONTENT = b'video' * 1000
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(str(tmp_path / 'blobs'))
+
+def _upload(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(CONTENT)
+    return str(path)
+
+class TestBlobStore:
+    """Cada conteúdo é guardado uma única vez"""
+
+    def test_ingest_moves_file(self, blobs, tmp_path):
+        upload = _upload(tmp_path, 'a.mp4')
+        dest = blobs.ingest(upload, DIGEST)
+        assert dest == os.path.join(blobs.root, DIGEST[:2], DIGEST)
+        assert not os.path.exists(upload)
+        assert blobs.exists(DIGEST)
+        assert blobs.size(DIGEST) == len(CONTENT)
+
+    def test_ingest_drops_duplicate_copy(self, blobs, tmp_path):
+        blobs.ingest(_upload(tmp_path, 'a.mp4'), DIGEST)
+        duplicate = _upload(tmp_path, 'b.mp4')
+        dest = blobs.ingest(duplicate, DIGEST)
+        assert not os.path.exists(duplicate)
+        assert os.listdir(os.path.dirname(dest)) == [DIGEST]
+
+    @pytest.mark.parametrize('digest', ['', 'abc', DIGEST.upper(), '../' + DIGEST[3:], DIGEST + '0'])
+    def test_path_for_rejects_invalid_digest(self, blobs, digest):
+        with pytest.raises(ValueError):
+            blobs.path_for(digest)
+        assert not blobs.exists(digest)
+        assert blobs.size(digest) is None
+
+    def test_remove_includes_derived_files(self, blobs, tmp_path):
+        dest = blobs.ingest(_upload(tmp_path, 'a.mp4'), DIGEST)
+        with open(dest + '.keyframes.json', 'w') as f:
+            f.write('[]')
+        blobs.remove(DIGEST)
+        assert os.listdir(os.path.dirname(dest)) == []
+        # Blob inexistente: nada a fazer
+        blobs.remove(DIGEST)
+
+class TestHashFile:
+    def test_resumes_partial_hash(self, tmp_path):
+        path = _upload(tmp_path, 'a.mp4')
+        partial = hashlib.sha256(CONTENT[:100])
+        assert hash_file(path, 100, partial) == DIGEST
+        assert hash_file(path) == DIGEST
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Testes do limite de sessões simultâneas do encoder
+"""
+
+import threading
+import time
+
+from encoder_slots import EncoderSlots
+
+def _run_jobs(slots, weights, duration=0.05):
+    """Executa os jobs em threads e retorna o maior número de sessões abertas ao mesmo tempo"""
+    lock = threading.Lock()
+    state = {'open': 0, 'peak': 0}
+
+    def job(weight):
+        with slots.hold(weight):
+            with lock:
+                state['open'] += weight
+                state['peak'] = max(state['peak'], state['open'])
+            time.sleep(duration)
+            with lock:
+                state['open'] -= weight
+
+    threads = [threading.Thread(target=job, args=(weight,)) for weight in weights]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return state['peak']
+
+class TestEncoderSlots:
+    """Jobs default+vertical ocupam dois slots"""
+
+    def test_dual_jobs_count_twice(self):
+        # Três jobs duplos com capacidade 3: no máximo um duplo e nada mais cabe ao lado
+        assert _run_jobs(EncoderSlots(3), [2, 2, 2]) == 2
+
+    def test_mixed_jobs_never_exceed_capacity(self):
+        assert _run_jobs(EncoderSlots(3), [2, 1, 2, 1, 1, 2]) <= 3
+
+    def test_weight_capped_at_capacity(self):
+        """Com capacidade 1, um job duplo ainda roda (sozinho)"""
+        slots = EncoderSlots(1)
+        with slots.hold(2):
+            assert slots._available == 0
+        assert slots._available == 1
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Testes das funções HTTP da API (faixas de bytes nos downloads e uploads)
+Requerem FastAPI; a API é importada em uma pasta temporária porque cria
+uploads/ e queue.db no diretório atual
+"""
+
+import hashlib
+import importlib
+import os
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('api'))
+    try:
+        yield importlib.import_module('main_api')
+    finally:
+        os.chdir(cwd)
+
+class TestParseRangeHeader:
+    """Interpretação do header Range (RFC 9110)"""
+
+    @pytest.mark.parametrize('header, expected', [
+        ('bytes=0-9', (0, 10)),
+        ('bytes=5-', (5, 100)),
+        ('bytes=-10', (90, 100)),
+        ('bytes=-500', (0, 100)),
+        ('bytes=90-500', (90, 100)),
+        ('BYTES=1-1', (1, 2)),
+    ])
+    def test_satisfiable(self, api, header, expected):
+        assert api.parse_range_header(header, 100) == expected
+
+    @pytest.mark.parametrize('header', [
+        'bytes=5-2',
+        'bytes=-',
+        'bytes=abc',
+        'bytes=+1-2',
+        'bytes=0-1,5-9',
+        'items=0-9',
+    ])
+    def test_invalid_is_ignored(self, api, header):
+        """Faixas inválidas ou múltiplas são ignoradas: resposta 200 com o arquivo inteiro"""
+        assert api.parse_range_header(header, 100) is None
+
+    @pytest.mark.parametrize('header', ['bytes=100-', 'bytes=150-200', 'bytes=-0'])
+    def test_unsatisfiable(self, api, header):
+        with pytest.raises(HTTPException) as error:
+            api.parse_range_header(header, 100)
+        assert error.value.status_code == 416
+        assert error.value.headers['Content-Range'] == 'bytes */100'
+
+class TestDownloadOutput:
+    """Download de uma saída com Range, If-Range e If-None-Match"""
+
+    ITEM_ID = 'item'
+    FILE_NAME = 'video_seg_1_default.mp4'
+    CONTENT = bytes(range(256)) * 4
+
+    @pytest.fixture
+    def client(self, api, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        output_folder = tmp_path / api.UPLOAD_DIR / self.ITEM_ID / 'output'
+        output_folder.mkdir(parents=True)
+        (output_folder / self.FILE_NAME).write_bytes(self.CONTENT)
+        monkeypatch.setattr(api, 'get_item', lambda item_id: object() if item_id == self.ITEM_ID else None)
+        return TestClient(api.app)
+
+    def _url(self):
+        return f'/download/{self.ITEM_ID}/{self.FILE_NAME}'
+
+    def test_range(self, client):
+        response = client.get(self._url(), headers={'Range': 'bytes=10-19'})
+        assert response.status_code == 206
+        assert response.headers['Content-Range'] == f'bytes 10-19/{len(self.CONTENT)}'
+        assert response.content == self.CONTENT[10:20]
+
+    @pytest.mark.parametrize('header', ['bytes=5-2', 'bytes=abc', 'bytes=0-1,5-9'])
+    def test_ignored_range_returns_full_file(self, client, header):
+        """Range inválido ou com várias faixas: 200 com o arquivo inteiro"""
+        response = client.get(self._url(), headers={'Range': header})
+        assert response.status_code == 200
+        assert response.headers['Content-Length'] == str(len(self.CONTENT))
+        assert 'Content-Range' not in response.headers
+        assert response.content == self.CONTENT
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get(self._url(), headers={'Range': f'bytes={len(self.CONTENT)}-'})
+        assert response.status_code == 416
+
+    def test_if_range_matching_etag(self, client):
+        etag = client.get(self._url()).headers['ETag']
+        response = client.get(self._url(), headers={'Range': 'bytes=0-3', 'If-Range': etag})
+        assert response.status_code == 206
+        assert response.content == self.CONTENT[:4]
+
+    def test_if_range_matching_date(self, client):
+        last_modified = client.get(self._url()).headers['Last-Modified']
+        response = client.get(self._url(), headers={'Range': 'bytes=0-3', 'If-Range': last_modified})
+        assert response.status_code == 206
+
+    def test_if_range_stale_returns_full_file(self, client):
+        """Arquivo alterado desde a primeira parte: o cliente recebe o arquivo inteiro"""
+        response = client.get(self._url(), headers={'Range': 'bytes=0-3', 'If-Range': '"outra-versao"'})
+        assert response.status_code == 200
+        assert response.content == self.CONTENT
+
+    def test_if_none_match(self, client):
+        etag = client.get(self._url()).headers['ETag']
+        response = client.get(self._url(), headers={'If-None-Match': f'W/{etag}'})
+        assert response.status_code == 304
+
+    def test_unlisted_output(self, client, api, tmp_path):
+        """Arquivos parciais não são servidos"""
+        output_folder = tmp_path / api.UPLOAD_DIR / self.ITEM_ID / 'output'
+        (output_folder / 'video_seg_2_default.part.mp4').write_bytes(b'parcial')
+        response = client.get(f'/download/{self.ITEM_ID}/video_seg_2_default.part.mp4')
+        assert response.status_code == 404
+
+class TestParseContentRange:
+    """Header Content-Range dos PUTs de upload"""
+
+    @pytest.mark.parametrize('header, expected', [
+        ('bytes 0-9/100', (0, 10)),
+        ('bytes 90-99/100', (90, 100)),
+        ('bytes 0-49/*', (0, 50)),
+    ])
+    def test_valid(self, api, header, expected):
+        assert api.parse_content_range(header, 100) == expected
+
+    @pytest.mark.parametrize('header', [None, 'bytes', 'bytes a-b/100', 'bytes 0-/100'])
+    def test_malformed(self, api, header):
+        with pytest.raises(HTTPException) as error:
+            api.parse_content_range(header, 100)
+        assert error.value.status_code == 400
+
+    @pytest.mark.parametrize('header', ['bytes 90-100/100', 'bytes 9-0/100', 'bytes 0-9/200', 'items 0-9/100'])
+    def test_outside_upload(self, api, header):
+        with pytest.raises(HTTPException) as error:
+            api.parse_content_range(header, 100)
+        assert error.value.status_code == 416
+
+class TestBlobDeduplication:
+    """Uploads com o mesmo conteúdo compartilham o blob até o último item ser removido"""
+
+    CONTENT = b'mesmo video' * 100
+
+    @pytest.fixture
+    def client(self, api):
+        return TestClient(api.app)
+
+    def _upload(self, client, name):
+        response = client.post('/upload/', files={'file': (name, self.CONTENT, 'video/mp4')})
+        assert response.status_code == 200
+        return response.json()['id']
+
+    def test_blob_removed_with_last_item(self, api, client):
+        digest = hashlib.sha256(self.CONTENT).hexdigest()
+        first = self._upload(client, 'a.mp4')
+        second = self._upload(client, 'b.mp4')
+        assert api.get_item(first).blobDigest == api.get_item(second).blobDigest == digest
+        # A cópia recebida no segundo upload foi descartada
+        assert not os.path.exists(os.path.join(api.UPLOAD_DIR, second, 'b.mp4'))
+
+        assert client.delete(f'/queue/{first}').status_code == 200
+        assert api.blobs.exists(digest)
+        assert client.get(f'/blobs/{digest}').json()['size'] == len(self.CONTENT)
+
+        assert client.delete(f'/queue/{second}').status_code == 200
+        assert not api.blobs.exists(digest)
+        assert client.get(f'/blobs/{digest}').status_code == 404
+
+    def test_enqueue_from_missing_blob(self, client):
+        response = client.post('/queue/from-blob', json={'sha256': '0' * 64, 'fileName': 'a.mp4'})
+        assert response.status_code == 404
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Testes da sondagem da plataforma em cache (encoders do FFmpeg)
+"""
+
+import json
+import os
+import subprocess
+import time
+from unittest.mock import Mock
+
+import pytest
+
+import platform_utils
+from platform_utils import PROBE_CACHE_FILE, PlatformDetector, parse_encoders
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ S..... = Subtitle
+ .F.... = Frame-level multithreading
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V....D h264_vaapi           H.264/AVC (VAAPI) (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+ S..... srt                  SubRip subtitle
+"""
+
+@pytest.fixture
+def probe_env(tmp_path, monkeypatch):
+    """FFmpeg falso e cache do usuário em uma pasta temporária"""
+    ffmpeg_path = tmp_path / 'ffmpeg'
+    ffmpeg_path.write_text('')
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    monkeypatch.setattr(platform_utils.shutil, 'which', lambda name: str(ffmpeg_path))
+    monkeypatch.setattr(platform_utils, 'get_user_cache_dir', lambda: str(cache_dir))
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        return Mock(stdout=ENCODERS_OUTPUT)
+
+    monkeypatch.setattr(platform_utils.subprocess, 'run', fake_run)
+    return ffmpeg_path, cache_dir / PROBE_CACHE_FILE, calls
+
+def _detector():
+    detector = PlatformDetector()
+    if detector._refresh_thread is not None:
+        detector._refresh_thread.join()
+    return detector
+
+class TestParseEncoders:
+    """Leitura da saída de `ffmpeg -encoders`"""
+
+    def test_lists_every_encoder(self):
+        assert parse_encoders(ENCODERS_OUTPUT) == ['libx264', 'h264_nvenc', 'h264_vaapi', 'aac', 'srt']
+
+    def test_legend_is_not_an_encoder(self):
+        assert '=' not in parse_encoders(ENCODERS_OUTPUT)
+
+    def test_output_without_separator(self):
+        assert parse_encoders(" V....D libx264   libx264 H.264\n") == ['libx264']
+
+class TestProbeCache:
+    """Cache da sondagem associado ao binário do FFmpeg"""
+
+    def test_key_follows_ffmpeg_binary(self, probe_env):
+        ffmpeg_path, _, _ = probe_env
+        detector = _detector()
+        key = detector._probe_key()
+        assert key['ffmpeg'] == str(ffmpeg_path)
+        assert key == detector._probe_key()
+
+        # FFmpeg atualizado: mtime diferente invalida o cache
+        os.utime(ffmpeg_path, ns=(0, key['ffmpeg_mtime'] + 10 ** 9))
+        assert detector._probe_key() != key
+
+    def test_probe_runs_once_and_is_cached(self, probe_env):
+        _, cache_path, calls = probe_env
+        _detector()
+        encoder_calls = [command for command in calls if '-encoders' in command]
+        assert len(encoder_calls) == 1
+        assert json.loads(cache_path.read_text())['probe']['encoders'] == parse_encoders(ENCODERS_OUTPUT)
+
+        # Segunda inicialização: só lê o cache, nenhum subprocesso
+        calls.clear()
+        detector = _detector()
+        assert calls == []
+        assert detector._refresh_thread is None
+        assert detector._probe['encoders'] == parse_encoders(ENCODERS_OUTPUT)
+
+    def test_stale_cache_is_refreshed(self, probe_env):
+        _, cache_path, calls = probe_env
+        detector = _detector()
+        cache_path.write_text(json.dumps({
+            'key': detector._probe_key(), 'probed_at': time.time() - 2 * platform_utils.PROBE_MAX_AGE,
+            'probe': {'encoders': []}
+        }))
+        calls.clear()
+        _detector()
+        assert any('-encoders' in command for command in calls)
+
+    def test_failed_probe_is_not_cached(self, probe_env, monkeypatch):
+        _, cache_path, _ = probe_env
+
+        def timeout(command, **kwargs):
+            raise subprocess.TimeoutExpired(command, kwargs.get('timeout'))
+
+        monkeypatch.setattr(platform_utils.subprocess, 'run', timeout)
+        detector = _detector()
+        assert detector._probe['encoders'] is None
+        assert detector.config.video_encoder == 'libx264'
+        assert not cache_path.exists()
+
+    def test_child_process_does_not_probe(self, probe_env, monkeypatch):
+        _, cache_path, calls = probe_env
+        monkeypatch.setattr(platform_utils.multiprocessing, 'parent_process', lambda: object())
+        detector = _detector()
+        assert detector._refresh_thread is None
+        assert calls == []
+        assert not cache_path.exists()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Testes da distribuição de eventos da fila pelo WebSocket
+"""
+
+import asyncio
+
+from queue_events import ClientConnection, ConnectionManager, QueueEventLog
+
+class FakeWebSocket:
+    """WebSocket que registra as mensagens; `block` segura os envios até ser liberado"""
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.closed_with = None
+        self.fail = fail
+        self.block = asyncio.Event()
+        self.block.set()
+
+    async def send_json(self, message):
+        if self.fail:
+            raise RuntimeError("conexão perdida")
+        await self.block.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+def _snapshot():
+    return {"type": "snapshot", "items": []}
+
+def _event(item_id, progress):
+    return {"type": "item_updated", "id": item_id, "item": {"progress": progress}}
+
+async def _drain():
+    """Deixa a tarefa de envio esvaziar a fila"""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+class TestClientConnection:
+    """Fila de envio por cliente: fusão por item e snapshot no estouro"""
+
+    def test_coalesces_events_of_same_item(self):
+        async def scenario():
+            websocket = FakeWebSocket()
+            connection = ClientConnection(websocket, _snapshot, max_pending=10, send_timeout=1)
+            connection.enqueue(_event("a", 10))
+            connection.enqueue(_event("b", 5))
+            connection.enqueue(_event("a", 20))
+            connection.task = asyncio.ensure_future(connection.run(lambda _: None))
+            await _drain()
+            connection.task.cancel()
+            return websocket.sent
+
+        sent = asyncio.run(scenario())
+        # Só o estado mais recente de "a", na posição do último evento
+        assert [(m["id"], m["item"]["progress"]) for m in sent] == [("b", 5), ("a", 20)]
+
+    def test_overflow_replaced_by_snapshot(self):
+        async def scenario():
+            websocket = FakeWebSocket()
+            connection = ClientConnection(websocket, _snapshot, max_pending=3, send_timeout=1)
+            for index in range(5):
+                connection.enqueue(_event(str(index), index))
+            # Eventos posteriores ao estouro já estão no snapshot montado no envio
+            connection.enqueue(_event("extra", 1))
+            connection.task = asyncio.ensure_future(connection.run(lambda _: None))
+            await _drain()
+            connection.task.cancel()
+            return websocket.sent
+
+        assert asyncio.run(scenario()) == [_snapshot()]
+
+    def test_failed_send_evicts_client(self):
+        async def scenario():
+            websocket = FakeWebSocket(fail=True)
+            manager = ConnectionManager(_snapshot, send_timeout=1)
+            connection = manager.connect(websocket)
+            await connection.task
+            return manager, websocket
+
+        manager, websocket = asyncio.run(scenario())
+        assert not manager.active_connections
+        assert websocket.closed_with == 1013
+
+    def test_slow_client_evicted_after_timeout(self):
+        async def scenario():
+            slow, fast = FakeWebSocket(), FakeWebSocket()
+            slow.block.clear()
+            manager = ConnectionManager(_snapshot, send_timeout=0.05)
+            slow_connection = manager.connect(slow, missed=[])
+            manager.connect(fast, missed=[])
+            manager.broadcast(_event("a", 50))
+            await asyncio.wait_for(slow_connection.task, 1)
+            await manager.close()
+            return manager, slow, fast
+
+        manager, slow, fast = asyncio.run(scenario())
+        # O cliente lento não atrasa os demais e sai da lista
+        assert fast.sent == [_event("a", 50)]
+        assert slow.sent == []
+        assert slow.closed_with == 1013
+        assert not manager.active_connections
+
+class TestQueueEventLog:
+    """Retomada por sequência após reconexão"""
+
+    def test_since_returns_missed_events(self):
+        log = QueueEventLog(max_events=10)
+        for index in range(3):
+            log.append(_event(str(index), index))
+        missed = log.since(1, log.epoch)
+        assert [message["seq"] for message in missed] == [2, 3]
+        assert log.since(3, log.epoch) == []
+
+    def test_since_requires_snapshot(self):
+        log = QueueEventLog(max_events=2)
+        for index in range(5):
+            log.append(_event(str(index), index))
+        # Eventos já descartados, época de outra execução ou sequência do futuro
+        assert log.since(1, log.epoch) is None
+        assert log.since(4, "outra") is None
+        assert log.since(9, log.epoch) is None
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Testes da fila persistida em SQLite: gravação write-behind do QueueState e
+importação do queue.json legado
+"""
+
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+
+import pytest
+
+from queue_store import QueueState, QueueStore
+
+@dataclass
+class Item:
+    """Item mínimo com a interface usada pelo QueueState (id e dict())"""
+    id: str
+    status: str = "pending"
+    createdAt: str = "2024-01-01T00:00:00"
+    updatedAt: str = "2024-01-01T00:00:00"
+
+    def dict(self):
+        return asdict(self)
+
+@pytest.fixture
+def store(tmp_path):
+    store = QueueStore(str(tmp_path / 'queue.db'))
+    yield store
+    store.close()
+
+def _stored(store):
+    return {data['id']: data['status'] for data in store.list()}
+
+class TestWriteBehind:
+    """Alterações ficam em memória e são gravadas em lote"""
+
+    def test_debounce(self, store):
+        async def scenario():
+            state = QueueState(store, Item, flush_delay=0.05, max_delay=1)
+            state.start()
+            await state.put(Item('a'))
+            await asyncio.sleep(0.01)
+            before = _stored(store)
+            await asyncio.sleep(0.2)
+            after = _stored(store)
+            await state.stop()
+            return before, after
+
+        before, after = asyncio.run(scenario())
+        assert before == {}
+        assert after == {'a': 'pending'}
+
+    def test_max_delay_under_constant_changes(self, store):
+        """Alterações contínuas não adiam a gravação além de max_delay"""
+        async def scenario():
+            state = QueueState(store, Item, flush_delay=0.1, max_delay=0.2)
+            state.start()
+            for index in range(20):
+                await state.put(Item('a', status=str(index)))
+                await asyncio.sleep(0.03)
+            # Ainda recebendo alterações: o banco já tem uma versão intermediária
+            during = _stored(store)
+            await state.stop()
+            return during, _stored(store)
+
+        during, after = asyncio.run(scenario())
+        assert 'a' in during
+        assert after == {'a': '19'}
+
+    def test_stop_flushes_pending_changes(self, store):
+        async def scenario():
+            state = QueueState(store, Item, flush_delay=10, max_delay=10)
+            state.start()
+            await state.put(Item('a'))
+            await state.stop()
+
+        asyncio.run(scenario())
+        assert _stored(store) == {'a': 'pending'}
+
+    def test_remove_then_put(self, store):
+        """Item removido e recriado antes da gravação continua no banco"""
+        async def scenario():
+            state = QueueState(store, Item)
+            await state.put(Item('a'))
+            await state.flush()
+            await state.remove('a')
+            await state.put(Item('a', status='done'))
+            await state.flush()
+
+        asyncio.run(scenario())
+        assert _stored(store) == {'a': 'done'}
+
+    def test_put_then_remove_writes_nothing(self, store, monkeypatch):
+        batches = []
+        monkeypatch.setattr(store, 'write_batch', lambda items, deleted: batches.append((items, deleted)))
+
+        async def scenario():
+            state = QueueState(store, Item)
+            await state.put(Item('a'))
+            await state.remove('a')
+            await state.flush()
+
+        asyncio.run(scenario())
+        assert batches == [([], ['a'])]
+
+    def test_load(self, store):
+        store.write_batch([Item('a', status='done').dict()], [])
+        state = QueueState(store, Item)
+        state.load()
+        assert state.get('a') == Item('a', status='done')
+        assert len(state) == 1
+
+class TestFlushFailure:
+    """Falha na gravação: as alterações voltam para a próxima tentativa"""
+
+    @pytest.fixture
+    def fail_next(self, store, monkeypatch):
+        """Faz a próxima gravação falhar"""
+        write_batch = store.write_batch
+        pending = []
+
+        def flaky(items, deleted):
+            if pending:
+                pending.pop()
+                raise OSError("disco cheio")
+            write_batch(items, deleted)
+
+        monkeypatch.setattr(store, 'write_batch', flaky)
+        return lambda: pending.append(True)
+
+    def test_retry_keeps_newer_state(self, store, fail_next):
+        async def scenario():
+            state = QueueState(store, Item)
+            await state.put(Item('a'))
+            await state.put(Item('b'))
+            fail_next()
+            await state.flush()
+            dirty_after_failure = set(state._dirty)
+            # Alterações feitas depois da falha prevalecem na nova tentativa
+            await state.put(Item('a', status='done'))
+            await state.remove('b')
+            await state.flush()
+            return dirty_after_failure
+
+        assert asyncio.run(scenario()) == {'a', 'b'}
+        assert _stored(store) == {'a': 'done'}
+
+    def test_failed_remove_is_retried(self, store, fail_next):
+        async def scenario():
+            state = QueueState(store, Item)
+            await state.put(Item('a'))
+            await state.flush()
+            await state.remove('a')
+            fail_next()
+            await state.flush()
+            deleted_after_failure = set(state._deleted)
+            before_retry = _stored(store)
+            await state.flush()
+            return deleted_after_failure, before_retry
+
+        deleted_after_failure, before_retry = asyncio.run(scenario())
+        assert deleted_after_failure == {'a'}
+        assert before_retry == {'a': 'pending'}
+        assert _stored(store) == {}
+
+    def test_failed_remove_not_retried_after_put(self, store, fail_next):
+        """Item recriado depois de uma remoção que falhou é gravado, não apagado"""
+        async def scenario():
+            state = QueueState(store, Item)
+            await state.put(Item('a'))
+            await state.flush()
+            await state.remove('a')
+            fail_next()
+            await state.flush()
+            await state.put(Item('a', status='done'))
+            deleted = set(state._deleted)
+            await state.flush()
+            return deleted
+
+        assert asyncio.run(scenario()) == set()
+        assert _stored(store) == {'a': 'done'}
+
+class TestImportJson:
+    """Importação única do queue.json legado"""
+
+    def test_existing_rows_win_and_file_is_renamed(self, store, tmp_path):
+        store.write_batch([Item('a', status='done').dict()], [])
+        json_path = tmp_path / 'queue.json'
+        json_path.write_text(json.dumps({
+            'a': Item('a', status='pending').dict(),
+            'b': Item('b', status='pending').dict(),
+        }))
+
+        assert store.import_json(str(json_path)) == 2
+        assert _stored(store) == {'a': 'done', 'b': 'pending'}
+        assert not json_path.exists()
+        assert (tmp_path / 'queue.json.imported').exists()
+
+        # Segunda inicialização: nada a importar
+        assert store.import_json(str(json_path)) == 0
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Testes do agendador da fila: ordem de execução, limite de jobs simultâneos,
+recuperação após reinício e cancelamento
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+
+import pytest
+
+from queue_store import QueueState, QueueStore
+from scheduler import JobScheduler
+
+@dataclass
+class Item:
+    id: str
+    status: str = "pending"
+    priority: int = 0
+    progress: float = 0
+    createdAt: str = "2024-01-01T00:00:00"
+    updatedAt: str = "2024-01-01T00:00:00"
+
+    def dict(self):
+        return asdict(self)
+
+@pytest.fixture
+def store(tmp_path):
+    store = QueueStore(str(tmp_path / 'queue.db'))
+    yield store
+    store.close()
+
+async def _state(store, items):
+    state = QueueState(store, Item)
+    for item in items:
+        await state.put(item)
+    return state
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+class TestScheduling:
+    """Escolha do próximo item e limite de workers"""
+
+    def test_priority_then_arrival(self, store):
+        async def scenario():
+            state = await _state(store, [
+                Item('antigo', createdAt='2024-01-01T00:00:01'),
+                Item('urgente', priority=5, createdAt='2024-01-01T00:00:03'),
+                Item('novo', createdAt='2024-01-01T00:00:02'),
+                Item('normal', priority=1, createdAt='2024-01-01T00:00:04'),
+            ])
+            order = []
+
+            async def runner(item_id):
+                order.append(item_id)
+                state.get(item_id).status = "completed"
+
+            scheduler = JobScheduler(state, runner, max_workers=1)
+            await scheduler.start()
+            await _settle()
+            await scheduler.stop()
+            return order
+
+        assert asyncio.run(scenario()) == ['urgente', 'normal', 'antigo', 'novo']
+
+    def test_max_workers(self, store):
+        async def scenario():
+            state = await _state(store, [Item(str(index)) for index in range(5)])
+            release = asyncio.Event()
+            running, peak = set(), []
+
+            async def runner(item_id):
+                state.get(item_id).status = "processing"
+                running.add(item_id)
+                peak.append(len(running))
+                await release.wait()
+                running.discard(item_id)
+                state.get(item_id).status = "completed"
+
+            scheduler = JobScheduler(state, runner, max_workers=2)
+            await scheduler.start()
+            await _settle()
+            running_before_release = len(running)
+            release.set()
+            await _settle()
+            await scheduler.stop()
+            return running_before_release, max(peak), [item.status for item in state.values()]
+
+        running_before_release, peak, statuses = asyncio.run(scenario())
+        assert running_before_release == 2
+        assert peak == 2
+        assert statuses == ['completed'] * 5
+
+    def test_interrupted_jobs_are_resumed(self, store):
+        """Itens em processamento quando o servidor parou voltam para a fila"""
+        async def scenario():
+            state = await _state(store, [Item('a', status='processing', progress=50)])
+            seen = []
+
+            async def runner(item_id):
+                item = state.get(item_id)
+                seen.append((item.status, item.progress))
+                item.status = "completed"
+
+            scheduler = JobScheduler(state, runner, max_workers=1)
+            await scheduler.start()
+            await _settle()
+            await scheduler.stop()
+            return seen
+
+        assert asyncio.run(scenario()) == [('pending', 0)]
+
+class TestCancel:
+    """Cancelamento de itens pendentes e em execução"""
+
+    def _run(self, store, runner_factory, cancel_id):
+        async def scenario():
+            state = await _state(store, [
+                Item('a', createdAt='2024-01-01T00:00:01'),
+                Item('b', createdAt='2024-01-01T00:00:02'),
+            ])
+            changes = []
+
+            async def on_change(item):
+                changes.append((item.id, item.status))
+
+            scheduler = JobScheduler(state, runner_factory(state), max_workers=1, on_change=on_change)
+            await scheduler.start()
+            await _settle()
+            cancelled = await scheduler.cancel(cancel_id)
+            await _settle()
+            result = (cancelled, state.get('a').status, state.get('b').status, changes, scheduler.is_running('a'))
+            await scheduler.stop()
+            return result
+
+        return asyncio.run(scenario())
+
+    @staticmethod
+    def _blocking_runner(state):
+        async def runner(item_id):
+            state.get(item_id).status = "processing"
+            await asyncio.Event().wait()
+        return runner
+
+    def test_cancel_pending(self, store):
+        cancelled, status_a, status_b, changes, a_running = self._run(store, self._blocking_runner, 'b')
+        assert cancelled
+        assert (status_a, status_b) == ('processing', 'cancelled')
+        assert changes == [('b', 'cancelled')]
+        assert a_running
+
+    def test_cancel_running(self, store):
+        cancelled, status_a, status_b, changes, a_running = self._run(store, self._blocking_runner, 'a')
+        assert cancelled
+        assert status_a == 'cancelled'
+        assert changes == [('a', 'cancelled')]
+        assert not a_running
+        # A vaga liberada vai para o próximo item
+        assert status_b == 'processing'
+
+    def test_job_finished_before_cancel(self, store):
+        """Job que termina antes de o cancelamento chegar mantém o resultado"""
+        def finishing_runner(state):
+            async def runner(item_id):
+                state.get(item_id).status = "processing"
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    state.get(item_id).status = "completed"
+            return runner
+
+        cancelled, status_a, _, changes, _ = self._run(store, finishing_runner, 'a')
+        assert not cancelled
+        assert status_a == 'completed'
+        assert changes == []
+
+    def test_finished_item_is_not_cancellable(self, store):
+        async def scenario():
+            state = await _state(store, [Item('a', status='completed')])
+            scheduler = JobScheduler(state, None, max_workers=1)
+            return await scheduler.cancel('a'), await scheduler.cancel('inexistente')
+
+        assert asyncio.run(scenario()) == (False, False)
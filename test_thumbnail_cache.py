@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Testes do cache em disco das miniaturas (pacotes de JPEGs por vídeo)
+"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+import thumbnail_cache
+from thumbnail_cache import PACK_MAGIC, ThumbnailCache, iter_cached_thumbnails
+
+SIZE = (64, 48)
+
+def _frame(value):
+    """Miniatura RGB de uma cor só: sobrevive ao JPEG com pouca diferença"""
+    return np.full((SIZE[1], SIZE[0], 3), value, dtype=np.uint8)
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(str(tmp_path / 'cache'), max_bytes=10 * 1024 * 1024)
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'conteudo do video' * 100)
+    return str(path)
+
+def _write_pack(cache, key, values):
+    writer = cache.writer(key)
+    for index, value in enumerate(values):
+        writer.add(_frame(value), index * 60.0)
+    writer.commit()
+    return cache.path_for(key)
+
+class TestThumbnailPack:
+    """Gravação e leitura de um pacote"""
+
+    def test_round_trip(self, cache):
+        _write_pack(cache, 'chave', [10, 128, 240])
+        loaded = cache.load('chave')
+        assert [frame_time for _, frame_time in loaded] == [0.0, 60.0, 120.0]
+        for (frame, _), value in zip(loaded, [10, 128, 240]):
+            assert frame.shape == (SIZE[1], SIZE[0], 3)
+            assert abs(int(frame.mean()) - value) <= 2
+
+    def test_missing_pack(self, cache):
+        assert cache.load('inexistente') is None
+
+    def test_empty_writer_writes_nothing(self, cache):
+        cache.writer('vazio').commit()
+        assert not os.path.exists(cache.path_for('vazio'))
+
+    @pytest.mark.parametrize('corrupt', [
+        lambda data: b'OUTRO123' + data[len(PACK_MAGIC):],  # assinatura errada
+        lambda data: data[:len(data) // 2],                 # pacote truncado
+        lambda data: data[:12] + b'[' + data[13:],          # cabeçalho JSON inválido
+    ])
+    def test_corrupt_pack_is_removed(self, cache, corrupt):
+        path = _write_pack(cache, 'chave', [10, 128])
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(corrupt(data))
+
+        assert cache.load('chave') is None
+        assert not os.path.exists(path)
+
+class TestCacheKey:
+    """A chave muda com o conteúdo do vídeo e com os parâmetros da amostragem"""
+
+    def test_same_video_same_key(self, cache, video):
+        assert cache.key_for(video, 60.0, SIZE) == cache.key_for(video, 60.0, SIZE)
+
+    def test_interval_and_size(self, cache, video):
+        key = cache.key_for(video, 60.0, SIZE)
+        assert cache.key_for(video, 30.0, SIZE) != key
+        assert cache.key_for(video, 60.0, (32, 24)) != key
+
+    def test_size_change(self, cache, video):
+        key = cache.key_for(video, 60.0, SIZE)
+        stat = os.stat(video)
+        with open(video, 'ab') as f:
+            f.write(b'x')
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert cache.key_for(video, 60.0, SIZE) != key
+
+    def test_mtime_change(self, cache, video):
+        key = cache.key_for(video, 60.0, SIZE)
+        stat = os.stat(video)
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert cache.key_for(video, 60.0, SIZE) != key
+
+class TestEviction:
+    """Remoção LRU pelo total de bytes"""
+
+    def test_least_recently_used_removed_first(self, cache):
+        paths = {key: _write_pack(cache, key, [50, 100]) for key in ('a', 'b', 'c')}
+        pack_size = os.path.getsize(paths['a'])
+        for age, key in enumerate(('b', 'a', 'c')):
+            # b é o mais antigo; c, o mais recente
+            os.utime(paths[key], (1_000_000 + age, 1_000_000 + age))
+
+        cache.max_bytes = 2 * pack_size
+        cache.evict()
+        assert not os.path.exists(paths['b'])
+        assert os.path.exists(paths['a']) and os.path.exists(paths['c'])
+
+    def test_load_refreshes_last_use(self, cache):
+        paths = {key: _write_pack(cache, key, [50, 100]) for key in ('a', 'b')}
+        for age, key in enumerate(('a', 'b')):
+            os.utime(paths[key], (1_000_000 + age, 1_000_000 + age))
+        cache.load('a')
+
+        cache.max_bytes = os.path.getsize(paths['a'])
+        cache.evict()
+        assert os.path.exists(paths['a'])
+        assert not os.path.exists(paths['b'])
+
+    def test_other_files_are_ignored(self, cache):
+        other = os.path.join(cache.root, 'outro.txt')
+        with open(other, 'w') as f:
+            f.write('x' * 100)
+        cache.max_bytes = 0
+        cache.evict()
+        assert os.path.exists(other)
+
+class TestIterCachedThumbnails:
+    """Segunda abertura do mesmo vídeo não decodifica nada"""
+
+    def test_second_open_uses_cache(self, cache, video, monkeypatch):
+        calls = []
+
+        def fake_decode(input_video, interval, size, on_progress):
+            calls.append(input_video)
+            yield _frame(10), 0.0
+            yield _frame(200), 60.0
+
+        monkeypatch.setattr(thumbnail_cache, 'iter_keyframe_thumbnails', fake_decode)
+        first = list(iter_cached_thumbnails(video, 60.0, SIZE, cache=cache))
+        progress = []
+        second = list(iter_cached_thumbnails(video, 60.0, SIZE, on_progress=progress.append, cache=cache))
+
+        assert calls == [video]
+        assert [frame_time for _, frame_time in second] == [frame_time for _, frame_time in first]
+        assert progress == [100]
+
+    def test_interrupted_decode_is_not_cached(self, cache, video, monkeypatch):
+        def fake_decode(input_video, interval, size, on_progress):
+            yield _frame(10), 0.0
+            yield _frame(200), 60.0
+
+        monkeypatch.setattr(thumbnail_cache, 'iter_keyframe_thumbnails', fake_decode)
+        thumbnails = iter_cached_thumbnails(video, 60.0, SIZE, cache=cache)
+        next(thumbnails)
+        thumbnails.close()
+        assert cache.load(cache.key_for(video, 60.0, SIZE)) is None
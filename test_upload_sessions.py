@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes das sessões de upload retomável
+"""
+
+import os
+import time
+
+import pytest
+
+from upload_sessions import SESSION_FILE, UploadSession, UploadSessionManager
+
+def _session(size=100, ranges=None):
+    return UploadSession(
+        id='sessao', fileName='video.mp4', size=size, metadata={},
+        createdAt='2024-01-01T00:00:00', ranges=ranges or []
+    )
+
+class TestAddRange:
+    """Faixas recebidas são mantidas ordenadas e unidas"""
+
+    def test_out_of_order(self):
+        session = _session()
+        session.add_range(50, 60)
+        session.add_range(0, 10)
+        assert session.ranges == [[0, 10], [50, 60]]
+        assert session.received == 20
+        assert not session.is_complete
+
+    def test_adjacent_ranges_merge(self):
+        session = _session()
+        session.add_range(0, 10)
+        session.add_range(10, 20)
+        assert session.ranges == [[0, 20]]
+
+    def test_overlap_and_gap_fill(self):
+        session = _session()
+        session.add_range(0, 30)
+        session.add_range(60, 100)
+        session.add_range(20, 70)
+        assert session.ranges == [[0, 100]]
+        assert session.is_complete
+
+    def test_repeated_range(self):
+        session = _session()
+        session.add_range(0, 40)
+        session.add_range(0, 40)
+        assert session.ranges == [[0, 40]]
+        assert session.received == 40
+
+    def test_empty_range_ignored(self):
+        session = _session()
+        session.add_range(10, 10)
+        assert session.ranges == []
+
+    def test_empty_file_is_complete(self):
+        assert _session(size=0).is_complete
+
+class TestUploadSessionManager:
+    """Criação, validação e expiração das sessões"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return UploadSessionManager(str(tmp_path), max_size=1000, ttl=60)
+
+    def test_create_preallocates_file(self, manager):
+        session = manager.create('pasta/video.mp4', 500, {'defaults': [1]})
+        assert session.fileName == 'video.mp4'
+        assert os.path.getsize(manager.file_path(session)) == 500
+        assert manager.get(session.id) is session
+
+    @pytest.mark.parametrize('file_name', ['', '.', '..', 'a/..', SESSION_FILE, SESSION_FILE + '.tmp'])
+    def test_rejects_unsafe_names(self, manager, file_name):
+        with pytest.raises(ValueError):
+            manager.create(file_name, 10, {})
+
+    @pytest.mark.parametrize('size', [-1, 1001])
+    def test_rejects_invalid_size(self, manager, size):
+        with pytest.raises(ValueError):
+            manager.create('video.mp4', size, {})
+
+    def test_session_survives_restart(self, manager, tmp_path):
+        session = manager.create('video.mp4', 100, {})
+        session.add_range(0, 40)
+        manager.save(session)
+
+        restarted = UploadSessionManager(str(tmp_path))
+        loaded = restarted.get(session.id)
+        assert loaded.ranges == [[0, 40]]
+        assert loaded.fileName == 'video.mp4'
+
+    def test_expire_removes_idle_sessions(self, manager, tmp_path):
+        idle = manager.create('antigo.mp4', 100, {})
+        active = manager.create('novo.mp4', 100, {})
+        old = time.time() - 120
+        os.utime(os.path.join(manager.work_dir(idle.id), SESSION_FILE), (old, old))
+        # Pastas de jobs não têm arquivo de sessão e não são tocadas
+        (tmp_path / 'job').mkdir()
+
+        manager.expire()
+        assert manager.get(idle.id) is None
+        assert not os.path.exists(manager.work_dir(idle.id))
+        assert manager.get(active.id) is active
+        assert (tmp_path / 'job').exists()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Testes da extração de segmentos: agrupamento de minutos, sequências em uma
+única sessão do FFmpeg e corte com recodificação apenas das bordas (smart render)
+Os testes marcados com ffmpeg requerem FFmpeg e ffprobe no PATH
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+try:
+    import video_utils
+    from video_utils import _group_contiguous, extract_segment, extract_segment_run, extract_segment_smart
+except ImportError as e:
+    pytest.skip(f"Módulos do projeto não encontrados: {e}", allow_module_level=True)
+
+requires_ffmpeg = pytest.mark.skipif(
+    not shutil.which('ffmpeg') or not shutil.which('ffprobe'),
+    reason="FFmpeg não disponível"
+)
+
+def _probe_output(path):
+    """Duração e número de quadros de vídeo do arquivo"""
+    result = subprocess.run(
+        [
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'v:0',
+            '-count_frames',
+            '-show_entries', 'stream=nb_read_frames:format=duration',
+            '-of', 'json',
+            path
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    info = json.loads(result.stdout)
+    return float(info['format']['duration']), int(info['streams'][0]['nb_read_frames'])
+
+@pytest.fixture(scope='module')
+def h264_clip(tmp_path_factory):
+    """Clipe H.264 de 12 s a 25 fps com keyframe a cada 2 s e áudio AAC"""
+    path = str(tmp_path_factory.mktemp('smart') / 'source.mp4')
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error',
+            '-f', 'lavfi', '-i', 'testsrc=duration=12:size=320x240:rate=25',
+            '-f', 'lavfi', '-i', 'sine=frequency=440:duration=12',
+            '-c:v', 'libx264', '-g', '50', '-keyint_min', '50', '-sc_threshold', '0',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac',
+            '-y', path
+        ],
+        check=True
+    )
+    return path
+
+@pytest.fixture(scope='module')
+def long_clip(tmp_path_factory):
+    """Clipe de 2 min e 5 s em baixa resolução, dentro de uma pasta com '%' no nome"""
+    folder = tmp_path_factory.mktemp('run') / 'taxa_100%'
+    folder.mkdir()
+    path = str(folder / 'taxa_100%d.mp4')
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error',
+            '-f', 'lavfi', '-i', 'testsrc=duration=125:size=160x120:rate=5',
+            '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+            '-y', path
+        ],
+        check=True
+    )
+    return path
+
+class TestGroupContiguous:
+    """Minutos ordenados agrupados em sequências (primeiro minuto, quantidade)"""
+
+    def test_groups_adjacent_minutes(self):
+        assert _group_contiguous([0, 1, 2, 5, 7, 8], 10) == [(0, 3), (5, 1), (7, 2)]
+
+    def test_respects_max_length(self):
+        assert _group_contiguous([0, 1, 2, 3, 4], 2) == [(0, 2), (2, 2), (4, 1)]
+
+    def test_single_and_empty(self):
+        assert _group_contiguous([4], 3) == [(4, 1)]
+        assert _group_contiguous([], 3) == []
+
+class TestSegmentRunPattern:
+    """'%' no nome do vídeo e na pasta de saída é escapado no padrão do muxer"""
+
+    def test_whole_path_is_escaped(self, monkeypatch):
+        commands = []
+        monkeypatch.setattr(video_utils, '_run_ffmpeg', lambda cmd, path, timeout=None: commands.append(cmd) or True)
+        output_folder = os.path.join('videos', '50%_off')
+        assert extract_segment_run('50%_off.mp4', output_folder, '50%_off', 0, 2, default=True, vertical=True)
+
+        patterns = [arg for arg in commands[0] if arg.endswith('.mp4') and arg != '50%_off.mp4']
+        assert patterns == [
+            os.path.join('videos', '50%%_off', '50%%_off') + '_segment_%d_default.mp4',
+            os.path.join('videos', '50%%_off', '50%%_off') + '_segment_%d_vertical.mp4',
+        ]
+
+@pytest.mark.ffmpeg
+@requires_ffmpeg
+class TestSegmentRun:
+    """Sequência de minutos em uma sessão gera os mesmos nomes da extração minuto a minuto"""
+
+    def test_percent_in_name(self, long_clip):
+        output_folder = os.path.dirname(long_clip)
+        video_name = os.path.splitext(os.path.basename(long_clip))[0]
+        assert extract_segment_run(long_clip, output_folder, video_name, 0, 2)
+
+        for minute in (1, 2):
+            path = os.path.join(output_folder, f"{video_name}_segment_{minute}_default.mp4")
+            duration, _ = _probe_output(path)
+            assert duration == pytest.approx(60, abs=1)
+        assert not os.path.exists(os.path.join(output_folder, f"{video_name}_segment_3_default.mp4"))
+
+@pytest.mark.ffmpeg
+@requires_ffmpeg
+class TestSmartCut:
+    """O corte inteligente deve equivaler a recodificar a janela inteira"""
+
+    @pytest.mark.parametrize('start_time, end_time', [(1.2, 9.6), (2.0, 8.0), (0.0, 5.4)])
+    def test_matches_full_reencode(self, h264_clip, tmp_path, start_time, end_time):
+        smart_path = str(tmp_path / 'smart.mp4')
+        full_path = str(tmp_path / 'full.mp4')
+
+        assert extract_segment_smart(h264_clip, smart_path, start_time, end_time)
+        assert extract_segment(h264_clip, full_path, start_time, end_time)
+
+        smart_duration, smart_frames = _probe_output(smart_path)
+        full_duration, full_frames = _probe_output(full_path)
+        # Arredondamento do -t nas bordas: no máximo um quadro de diferença
+        assert abs(smart_frames - full_frames) <= 1
+        assert smart_duration == pytest.approx(full_duration, abs=0.1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Testes do ZIP gerado sob demanda para o download das saídas
+"""
+
+import io
+import os
+import zipfile
+
+import pytest
+
+import zip_stream
+from zip_stream import ZipStream
+
+@pytest.fixture
+def sample_files(tmp_path):
+    """Arquivos de tamanhos variados, incluindo vazio e nome não ASCII"""
+    contents = {
+        'video_seg_1_default.mp4': os.urandom(300_000),
+        'vídeo_seg_2_vertical.mp4': b'segmento vertical' * 1000,
+        'vazio.mp4': b'',
+    }
+    files = []
+    for name, data in contents.items():
+        path = tmp_path / name
+        path.write_bytes(data)
+        files.append((name, str(path)))
+    return files, contents
+
+def _build(files, chunk_size=64 * 1024):
+    stream = ZipStream(files, chunk_size=chunk_size)
+    data = b''.join(stream)
+    return stream, data
+
+class TestZipStream:
+    """O arquivo gerado deve ser lido pelo zipfile sem erros"""
+
+    def test_round_trip(self, sample_files):
+        """Conteúdo, nomes e tamanho anunciado conferem com os arquivos de origem"""
+        files, contents = sample_files
+        stream, data = _build(files)
+
+        assert len(data) == stream.content_length
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == [name for name, _ in files]
+            for name, expected in contents.items():
+                info = archive.getinfo(name)
+                assert info.compress_type == zipfile.ZIP_STORED
+                assert archive.read(name) == expected
+
+    def test_small_chunks(self, sample_files):
+        """O tamanho dos blocos de leitura não altera o resultado"""
+        files, _ = sample_files
+        _, data = _build(files)
+        _, small_chunks = _build(files, chunk_size=1000)
+        assert small_chunks == data
+
+    def test_empty_archive(self):
+        """Sem arquivos, o resultado ainda é um ZIP válido"""
+        stream, data = _build([])
+        assert len(data) == stream.content_length
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.namelist() == []
+
+    def test_forced_zip64(self, sample_files, monkeypatch):
+        """Com limites reduzidos, entradas e diretório central usam registros ZIP64"""
+        monkeypatch.setattr(zip_stream, 'ZIP64_LIMIT', 1000)
+        monkeypatch.setattr(zip_stream, 'ZIP64_COUNT_LIMIT', 2)
+        files, contents = sample_files
+        stream, data = _build(files)
+
+        assert stream.zip64_end
+        assert len(data) == stream.content_length
+        # Registro de fim ZIP64 e seu localizador
+        assert b'PK\x06\x06' in data and b'PK\x06\x07' in data
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            for name, expected in contents.items():
+                assert archive.read(name) == expected
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from platform_utils import get_user_cache_dir
+from thumbnail_utils import THUMBNAIL_SIZE, iter_keyframe_thumbnails
+
+# Pacote: assinatura, tamanho do cabeçalho JSON, cabeçalho e os JPEGs em sequência
+PACK_MAGIC = b"SGTHUMB1"
+PACK_SUFFIX = ".thumbs"
+PARTIAL_HASH_BLOCK = 1024 * 1024
+JPEG_QUALITY = 90
+THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get("SEGMENTOR_THUMBNAIL_CACHE_MB", "512")) * 1024 * 1024
+
+def video_fingerprint(input_video: str) -> str:
+    """Identifica o conteúdo do vídeo sem lê-lo por inteiro: tamanho, mtime e hash do início e do fim"""
+    stat = os.stat(input_video)
+    hasher = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(input_video, "rb") as f:
+        hasher.update(f.read(PARTIAL_HASH_BLOCK))
+        if stat.st_size > 2 * PARTIAL_HASH_BLOCK:
+            f.seek(-PARTIAL_HASH_BLOCK, os.SEEK_END)
+            hasher.update(f.read(PARTIAL_HASH_BLOCK))
+    return hasher.hexdigest()
+
+class ThumbnailPackWriter:
+    """Acumula miniaturas já comprimidas em JPEG até o pacote ser gravado"""
+
+    def __init__(self, cache: "ThumbnailCache", key: str):
+        self.cache = cache
+        self.key = key
+        self._times: List[float] = []
+        self._blobs: List[bytes] = []
+
+    def add(self, frame: np.ndarray, frame_time: float) -> None:
+        success, encoded = cv2.imencode(
+            ".jpg", cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+        )
+        if success:
+            self._times.append(frame_time)
+            self._blobs.append(encoded.tobytes())
+
+    def commit(self) -> None:
+        if not self._blobs:
+            return
+        header = json.dumps({
+            "times": self._times,
+            "lengths": [len(blob) for blob in self._blobs]
+        }).encode()
+        path = self.cache.path_for(self.key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(PACK_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for blob in self._blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        self.cache.evict()
+
+class ThumbnailCache:
+    """Cache em disco das miniaturas de cada vídeo, um pacote de JPEGs por vídeo
+
+    A chave combina a impressão digital do vídeo com o intervalo de amostragem
+    e o tamanho das miniaturas. Os pacotes menos usados recentemente são
+    removidos quando o total ultrapassa `max_bytes`.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES):
+        self.root = root or os.path.join(get_user_cache_dir(), "thumbnails")
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def key_for(self, input_video: str, interval: float, size: Tuple[int, int]) -> str:
+        fingerprint = video_fingerprint(input_video)
+        return hashlib.sha256(f"{fingerprint}:{interval}:{size[0]}x{size[1]}".encode()).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key + PACK_SUFFIX)
+
+    def load(self, key: str) -> Optional[List[Tuple[np.ndarray, float]]]:
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                    raise ValueError("Pacote de miniaturas inválido")
+                header_length, = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_length))
+                times = header["times"]
+                # Todas as miniaturas em um único bloco; cada uma é uma visão dele
+                frames = None
+                for i, length in enumerate(header["lengths"]):
+                    encoded = np.frombuffer(f.read(length), dtype=np.uint8)
+                    frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+                    if frame is None:
+                        raise ValueError("Miniatura corrompida")
+                    if frames is None:
+                        frames = np.empty((len(times),) + frame.shape, dtype=np.uint8)
+                    if frame.shape != frames.shape[1:]:
+                        raise ValueError("Miniaturas de tamanhos diferentes")
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frames[i])
+                thumbnails = list(zip(frames, times)) if frames is not None else []
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, struct.error):
+            self._remove(path)
+            return None
+        # mtime marca o último uso para a remoção LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return thumbnails
+
+    def writer(self, key: str) -> ThumbnailPackWriter:
+        return ThumbnailPackWriter(self, key)
+
+    def evict(self) -> None:
+        """Remove os pacotes usados há mais tempo até o cache caber em `max_bytes`"""
+        packs = []
+        for name in os.listdir(self.root):
+            if not name.endswith(PACK_SUFFIX):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            packs.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in packs)
+        for _, size, path in sorted(packs):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def iter_cached_thumbnails(input_video: str, interval: float = 60.0,
+                           size: Tuple[int, int] = THUMBNAIL_SIZE,
+                           on_progress: Optional[Callable[[int], None]] = None,
+                           cache: Optional[ThumbnailCache] = None) -> Iterator[Tuple[np.ndarray, float]]:
+    """Como iter_keyframe_thumbnails, mas reaproveita as miniaturas de uma abertura anterior
+
+    O pacote só é gravado quando a amostragem termina; uma carga interrompida
+    não deixa cache incompleto.
+    """
+    try:
+        cache = cache or ThumbnailCache()
+        key = cache.key_for(input_video, interval, size)
+    except OSError:
+        # Sem cache disponível (diretório sem permissão, arquivo ilegível): decodificar normalmente
+        yield from iter_keyframe_thumbnails(input_video, interval, size, on_progress)
+        return
+
+    cached = cache.load(key)
+    if cached is not None:
+        for frame, frame_time in cached:
+            yield frame, frame_time
+        if on_progress:
+            on_progress(100)
+        return
+
+    writer = cache.writer(key)
+    for frame, frame_time in iter_keyframe_thumbnails(input_video, interval, size, on_progress):
+        writer.add(frame, frame_time)
+        yield frame, frame_time
+    try:
+        writer.commit()
+    except OSError:
+        pass
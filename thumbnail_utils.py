@@ -0,0 +1,264 @@
+import math
+import multiprocessing
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from platform_utils import get_platform_config
+from probe_utils import probe_streams
+
+# Tamanho das miniaturas exibidas na grade de minutos
+THUMBNAIL_SIZE = (500, 375)
+SHOWINFO_PTS_PATTERN = re.compile(r"pts_time:\s*(-?[\d.]+)")
+# Trechos por processo: mais trechos entregam as primeiras miniaturas mais cedo
+CHUNKS_PER_WORKER = 4
+# A grade tem uma miniatura por minuto: a posição do tile é o minuto extraído
+MINUTE_INTERVAL = 60.0
+GRAB_TIMEOUT = 30
+
+@dataclass
+class ThumbnailPolicy:
+    """Política de amostragem das miniaturas
+
+    A grade mantém um tile por minuto (MINUTE_INTERVAL; cada tile é um minuto
+    selecionável), então só a resolução é configurável: ela diminui para que a
+    grade inteira caiba em `memory_budget`.
+    Quadros mais próximos, a cada `detail_interval`, são carregados só quando
+    o usuário amplia um minuto.
+    """
+    detail_interval: float = 10.0
+    max_size: Tuple[int, int] = THUMBNAIL_SIZE
+    min_size: Tuple[int, int] = (200, 150)
+    memory_budget: int = 256 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "ThumbnailPolicy":
+        """Permite ajustar a política por variáveis de ambiente"""
+        policy = cls()
+        detail_interval = os.environ.get("SEGMENTOR_DETAIL_INTERVAL")
+        if detail_interval:
+            policy.detail_interval = max(1.0, float(detail_interval))
+        memory_mb = os.environ.get("SEGMENTOR_THUMBNAIL_MEMORY_MB")
+        if memory_mb:
+            policy.memory_budget = int(memory_mb) * 1024 * 1024
+        return policy
+
+    def thumbnail_size(self, duration: Optional[float]) -> Tuple[int, int]:
+        """Maior tamanho (até `max_size`) em que todas as miniaturas cabem no orçamento de memória"""
+        width, height = self.max_size
+        if not duration:
+            return self.max_size
+        count = math.ceil(duration / MINUTE_INTERVAL)
+        # QPixmap guarda 4 bytes por pixel
+        scale = min(1.0, math.sqrt(self.memory_budget / (count * width * height * 4)))
+        # Dimensões pares: exigidas por alguns formatos de pixel do FFmpeg
+        return (
+            max(self.min_size[0], int(width * scale) // 2 * 2),
+            max(self.min_size[1], int(height * scale) // 2 * 2)
+        )
+
+def get_video_duration(input_video: str) -> Optional[float]:
+    info = probe_streams(input_video)
+    try:
+        return float(info["format"]["duration"])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+def allocate_frames(count: int, size: Tuple[int, int]) -> np.ndarray:
+    """Bloco contíguo para `count` quadros RGB na resolução de exibição"""
+    width, height = size
+    return np.empty((count, height, width, 3), dtype=np.uint8)
+
+def grab_frame(input_video: str, time: float, size: Tuple[int, int] = THUMBNAIL_SIZE,
+               keyframe_only: bool = True, out: Optional[np.ndarray] = None
+               ) -> Optional[Tuple[np.ndarray, float]]:
+    """Decodifica um quadro a partir de `time` e o retorna em RGB, já reduzido pelo FFmpeg
+
+    Com `keyframe_only`, o seek na entrada posiciona o demuxer no keyframe
+    anterior e `-skip_frame nokey` faz o decoder ignorar todos os quadros que
+    não são keyframes, então nenhum GOP é decodificado por inteiro e o quadro
+    retornado é o primeiro keyframe a partir de `time`. Sem ele, o quadro é o
+    exato de `time` (mais lento). Os pixels são lidos do pipe diretamente em
+    `out` (um quadro de um bloco pré-alocado), sem cópias intermediárias.
+    Retorna (quadro, instante do quadro) ou None.
+    """
+    width, height = size
+    frame = out if out is not None else allocate_frames(1, size)[0]
+    skip_args = ['-skip_frame', 'nokey'] if keyframe_only else []
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(
+                [
+                    'ffmpeg', '-hide_banner', '-nostdin',
+                ] + skip_args + [
+                    '-ss', f'{time:.3f}',
+                    '-copyts',
+                    '-i', input_video,
+                    '-map', '0:v:0',
+                    '-frames:v', '1',
+                    '-vf', f'scale={width}:{height},showinfo',
+                    '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                    'pipe:1'
+                ],
+                stdout=subprocess.PIPE,
+                stderr=stderr_file
+            )
+        except FileNotFoundError:
+            return None
+
+        timer = threading.Timer(GRAB_TIMEOUT, process.kill)
+        timer.start()
+        try:
+            buffer = memoryview(frame).cast('B')
+            received = 0
+            while received < len(buffer):
+                count = process.stdout.readinto(buffer[received:])
+                if not count:
+                    break
+                received += count
+            process.stdout.close()
+            process.wait()
+        finally:
+            timer.cancel()
+
+        if process.returncode != 0 or received < len(buffer):
+            return None
+        stderr_file.seek(0)
+        match = SHOWINFO_PTS_PATTERN.search(stderr_file.read().decode(errors='replace'))
+    return frame, float(match.group(1)) if match else time
+
+def _grab_opencv(input_video: str, sample_times: List[float], size: Tuple[int, int],
+                 out: np.ndarray) -> List[float]:
+    """Amostragem com seek do OpenCV (decodifica a partir do keyframe anterior)
+
+    Grava os quadros em `out` e retorna os instantes dos que foram lidos.
+    """
+    video_cap = cv2.VideoCapture(input_video)
+    if not video_cap.isOpened():
+        return []
+    fps = video_cap.get(cv2.CAP_PROP_FPS)
+
+    # Otimização para Apple Silicon: usar interpolação mais eficiente
+    interpolation = cv2.INTER_LINEAR if get_platform_config().is_apple_silicon else cv2.INTER_CUBIC
+
+    frame_times = []
+    for i, sample_time in enumerate(sample_times):
+        frame_number = int(round(sample_time * fps))
+        video_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        success, frame = video_cap.read()
+        if not success:
+            break
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        cv2.resize(frame_rgb, size, dst=out[i], interpolation=interpolation)
+        frame_times.append(frame_number / fps)
+    video_cap.release()
+    return frame_times
+
+def _grab_chunk(input_video: str, sample_times: List[float], size: Tuple[int, int],
+                use_ffmpeg: bool) -> Tuple[np.ndarray, List[float]]:
+    """Executado nos processos do pool: decodifica um trecho contíguo da linha do tempo
+
+    Os quadros vão para um único bloco contíguo, devolvido ao processo
+    principal de uma vez. Menos quadros que instantes marca o fim do vídeo
+    (ou falha de decodificação).
+    """
+    frames = allocate_frames(len(sample_times), size)
+    if not use_ffmpeg:
+        frame_times = _grab_opencv(input_video, sample_times, size, frames)
+    else:
+        frame_times = []
+        for i, sample_time in enumerate(sample_times):
+            grabbed = grab_frame(input_video, sample_time, size, out=frames[i])
+            if grabbed is None:
+                break
+            frame_times.append(grabbed[1])
+    return frames[:len(frame_times)], frame_times
+
+def _opencv_duration(input_video: str) -> Optional[float]:
+    video_cap = cv2.VideoCapture(input_video)
+    if not video_cap.isOpened():
+        return None
+    fps = video_cap.get(cv2.CAP_PROP_FPS)
+    total_frames = video_cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    video_cap.release()
+    return total_frames / fps if fps > 0 else None
+
+def _iter_parallel(input_video: str, duration: float, interval: float, size: Tuple[int, int],
+                   use_ffmpeg: bool, max_workers: Optional[int],
+                   on_progress: Optional[Callable[[int], None]]) -> Iterator[Tuple[np.ndarray, float]]:
+    sample_times = [float(t) for t in np.arange(0, duration, interval)]
+    if not sample_times:
+        return
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(sample_times)))
+    # Trechos menores que a divisão exata: os primeiros chegam cedo à interface
+    chunk_size = max(1, math.ceil(len(sample_times) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [sample_times[i:i + chunk_size] for i in range(0, len(sample_times), chunk_size)]
+
+    # spawn em todas as plataformas: fork de um processo com Qt e threads ativas
+    # pode travar os filhos (e já é o padrão no macOS e no Windows)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    futures = [pool.submit(_grab_chunk, input_video, chunk, size, use_ffmpeg) for chunk in chunks]
+    try:
+        produced = 0
+        # Resultados na ordem da linha do tempo, conforme cada trecho termina
+        for future, chunk in zip(futures, chunks):
+            frames, frame_times = future.result()
+            # Cada quadro é uma visão do bloco recebido, sem cópia
+            for frame, frame_time in zip(frames, frame_times):
+                produced += 1
+                if on_progress:
+                    on_progress(int(produced / len(sample_times) * 100))
+                yield frame, frame_time
+            if len(frame_times) < len(chunk):
+                return
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+def iter_keyframe_thumbnails(input_video: str, interval: float = 60.0,
+                             size: Tuple[int, int] = THUMBNAIL_SIZE,
+                             on_progress: Optional[Callable[[int], None]] = None,
+                             max_workers: Optional[int] = None) -> Iterator[Tuple[np.ndarray, float]]:
+    """Gera (miniatura RGB, instante) para cada intervalo, em ordem, decodificando em paralelo
+
+    A linha do tempo é dividida em trechos decodificados por um pool de
+    processos. Usa o FFmpeg com decodificação só de keyframes; se ele não
+    estiver disponível, cada processo usa seu próprio cv2.VideoCapture.
+    """
+    duration = get_video_duration(input_video)
+    if duration is not None:
+        produced = False
+        for grabbed in _iter_parallel(input_video, duration, interval, size, True, max_workers, on_progress):
+            produced = True
+            yield grabbed
+        if produced:
+            return
+
+    # FFmpeg indisponível ou incapaz de decodificar o arquivo
+    duration = _opencv_duration(input_video)
+    if duration is not None:
+        yield from _iter_parallel(input_video, duration, interval, size, False, max_workers, on_progress)
+
+def iter_detail_frames(input_video: str, start: float, end: float, interval: float,
+                       size: Tuple[int, int] = THUMBNAIL_SIZE) -> Iterator[Tuple[np.ndarray, float]]:
+    """Quadros exatos a cada `interval` dentro de [start, end), para a visão ampliada de um minuto"""
+    sample_times = [float(t) for t in np.arange(start, end, interval)]
+    frames = allocate_frames(len(sample_times), size)
+    for i, sample_time in enumerate(sample_times):
+        grabbed = grab_frame(input_video, sample_time, size, keyframe_only=False, out=frames[i])
+        if grabbed is None:
+            if i == 0:
+                # FFmpeg indisponível: seek do OpenCV
+                frame_times = _grab_opencv(input_video, sample_times, size, frames)
+                yield from zip(frames, frame_times)
+            return
+        yield grabbed
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from blob_store import hash_file
+
+SESSION_FILE = ".upload.json"
+# O arquivo é pré-alocado no tamanho declarado: limitar o que um cliente pode reservar
+MAX_UPLOAD_SIZE = int(os.environ.get("SEGMENTOR_MAX_UPLOAD_GB", "50")) * 1024 ** 3
+# Sessões sem atividade por mais que isso são removidas com o arquivo parcial
+UPLOAD_SESSION_TTL = float(os.environ.get("SEGMENTOR_UPLOAD_TTL_HOURS", "24")) * 3600
+
+def sanitize_file_name(file_name: str) -> str:
+    """Apenas o nome do arquivo, sem diretórios; ValueError para nomes que não podem ser gravados"""
+    name = os.path.basename(file_name.replace("\\", "/"))
+    # O nome não pode coincidir com o arquivo da própria sessão nem com diretórios
+    if name in ("", ".", "..", SESSION_FILE) or name.startswith(SESSION_FILE + "."):
+        raise ValueError(f"Nome de arquivo inválido: {file_name!r}")
+    return name
+
+@dataclass
+class UploadSession:
+    """Sessão de upload retomável: o arquivo é gravado diretamente no destino por faixas de bytes"""
+    id: str
+    fileName: str
+    size: int
+    metadata: Dict[str, Any]
+    createdAt: str
+    ranges: List[List[int]] = field(default_factory=list)  # faixas recebidas [início, fim), ordenadas
+
+    def add_range(self, start: int, end: int) -> None:
+        """Registra a faixa [start, end) unindo-a às faixas adjacentes ou sobrepostas"""
+        if end <= start:
+            return
+        merged = []
+        for range_start, range_end in sorted(self.ranges + [[start, end]]):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        self.ranges = merged
+
+    @property
+    def received(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.ranges == [[0, self.size]] or self.size == 0
+
+    def to_response(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "fileName": self.fileName,
+            "size": self.size,
+            "received": self.received,
+            "ranges": self.ranges,
+            "complete": self.is_complete
+        }
+
+class UploadSessionManager:
+    """Cria e persiste sessões de upload em <root>/<id>/, ao lado do arquivo de destino"""
+
+    def __init__(self, root: str, max_size: int = MAX_UPLOAD_SIZE, ttl: float = UPLOAD_SESSION_TTL):
+        self.root = root
+        self.max_size = max_size
+        self.ttl = ttl
+        self._sessions: Dict[str, UploadSession] = {}
+        # Hash SHA-256 incremental do prefixo contíguo recebido: id -> [offset, hasher]
+        self._hashers: Dict[str, List[Any]] = {}
+
+    def work_dir(self, session_id: str) -> str:
+        return os.path.join(self.root, session_id)
+
+    def file_path(self, session: UploadSession) -> str:
+        return os.path.join(self.work_dir(session.id), session.fileName)
+
+    def create(self, file_name: str, size: int, metadata: Dict[str, Any]) -> UploadSession:
+        """Cria a sessão e reserva o arquivo; ValueError para nome ou tamanho inválidos"""
+        if size < 0 or size > self.max_size:
+            raise ValueError(f"Tamanho de upload inválido: {size}")
+        self.expire()
+        session = UploadSession(
+            id=str(uuid.uuid4()),
+            # Apenas o nome do arquivo: evita gravar fora da pasta da sessão
+            fileName=sanitize_file_name(file_name),
+            size=size,
+            metadata=metadata,
+            createdAt=datetime.now().isoformat()
+        )
+        os.makedirs(self.work_dir(session.id), exist_ok=True)
+        # Reservar o tamanho final para que as faixas possam chegar em qualquer ordem
+        with open(self.file_path(session), "wb") as f:
+            f.truncate(size)
+        self._sessions[session.id] = session
+        self._hashers[session.id] = [0, hashlib.sha256()]
+        self.save(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+
+        # Sessões sobrevivem a reinícios do servidor
+        session_path = os.path.join(self.work_dir(os.path.basename(session_id)), SESSION_FILE)
+        try:
+            with open(session_path, "r") as f:
+                session = UploadSession(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        self._sessions[session.id] = session
+        return session
+
+    def save(self, session: UploadSession) -> None:
+        session_path = os.path.join(self.work_dir(session.id), SESSION_FILE)
+        tmp_path = session_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(session), f)
+        os.replace(tmp_path, session_path)
+
+    def claim_hasher(self, session: UploadSession, offset: int):
+        """Reserva o hasher para um PUT que começa exatamente onde o hash parou
+
+        Enquanto reservado, outros PUTs gravam sem hashear; o trecho é lido do
+        disco na finalização.
+        """
+        state = self._hashers.get(session.id)
+        if state is not None and state[0] == offset:
+            return self._hashers.pop(session.id)[1]
+        return None
+
+    def release_hasher(self, session: UploadSession, offset: int, hasher) -> None:
+        if session.id in self._sessions:
+            self._hashers[session.id] = [offset, hasher]
+
+    def digest(self, session: UploadSession) -> str:
+        """SHA-256 do arquivo completo, lendo do disco só o que não foi hasheado durante o upload"""
+        state = self._hashers.get(session.id)
+        if state is None:
+            return hash_file(self.file_path(session))
+        offset, hasher = state
+        if offset == session.size:
+            return hasher.hexdigest()
+        return hash_file(self.file_path(session), offset, hasher)
+
+    def expire(self) -> None:
+        """Remove sessões abandonadas (sem PUT há mais de `ttl`) junto com o arquivo pré-alocado
+
+        Cada faixa recebida regrava o arquivo da sessão, então o mtime dele
+        marca a última atividade. Pastas sem esse arquivo (jobs, blobs) são ignoradas.
+        """
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            session_path = os.path.join(self.work_dir(name), SESSION_FILE)
+            try:
+                if os.path.getmtime(session_path) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            self._sessions.pop(name, None)
+            self._hashers.pop(name, None)
+            shutil.rmtree(self.work_dir(name), ignore_errors=True)
+
+    def close(self, session: UploadSession) -> None:
+        """Encerra a sessão mantendo o arquivo recebido"""
+        self._sessions.pop(session.id, None)
+        self._hashers.pop(session.id, None)
+        try:
+            os.remove(os.path.join(self.work_dir(session.id), SESSION_FILE))
+        except OSError:
+            pass
@@ -1,64 +1,64 @@
 import os
+import shutil
 import subprocess
 import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from encoder_slots import EncoderSlots
 from platform_utils import platform_detector, get_platform_config, is_apple_silicon, is_macos
+from probe_utils import can_stream_copy, find_keyframe_before, keyframes_between, probe_video_stream
 
 # Configurar logging para substituir messagebox
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-def extract_segment(input_video, output_path, start_time, end_time, vertical=False):
-    """Extrai segmento de vídeo com otimizações específicas da plataforma"""
-    try:
-        config = get_platform_config()
-        
-        # Construir comando FFmpeg otimizado para a plataforma
-        ffmpeg_cmd = platform_detector.get_ffmpeg_base_args()
-        
-        # Adicionar parâmetros de entrada
-        ffmpeg_cmd.extend([
-            '-ss', str(start_time),
-            '-i', input_video,
-            '-to', str(end_time - start_time)
+def _build_output_args(vertical=False, threads=None, include_filter=True, faststart=True):
+    """Monta os argumentos de uma saída (codificação, threads e memória) para a plataforma"""
+    config = get_platform_config()
+
+    # Adicionar configurações de codificação otimizadas
+    output_args = platform_detector.get_encoding_args(vertical, include_filter=include_filter, faststart=faststart)
+
+    # Limitar threads quando vários segmentos são processados em paralelo
+    if threads:
+        output_args.extend(['-threads', str(threads)])
+
+    # Adicionar otimizações de memória específicas da plataforma
+    memory_opts = config.memory_optimization
+    if memory_opts.get('buffer_size'):
+        output_args.extend(['-bufsize', memory_opts['buffer_size']])
+    if memory_opts.get('max_muxing_queue_size'):
+        output_args.extend(['-max_muxing_queue_size', str(memory_opts['max_muxing_queue_size'])])
+    if memory_opts.get('thread_queue_size'):
+        output_args.extend(['-thread_queue_size', str(memory_opts['thread_queue_size'])])
+
+    # Configurações específicas do Apple Silicon
+    if is_apple_silicon():
+        # Usar otimizações específicas do VideoToolbox
+        output_args.extend([
+            '-pix_fmt', 'yuv420p',
+            '-color_primaries', 'bt709',
+            '-color_trc', 'bt709',
+            '-colorspace', 'bt709'
         ])
-        
-        # Adicionar configurações de codificação otimizadas
-        encoding_args = platform_detector.get_encoding_args(vertical)
-        ffmpeg_cmd.extend(encoding_args)
-        
-        # Adicionar otimizações de memória específicas da plataforma
-        memory_opts = config.memory_optimization
-        if memory_opts.get('buffer_size'):
-            ffmpeg_cmd.extend(['-bufsize', memory_opts['buffer_size']])
-        if memory_opts.get('max_muxing_queue_size'):
-            ffmpeg_cmd.extend(['-max_muxing_queue_size', str(memory_opts['max_muxing_queue_size'])])
-        if memory_opts.get('thread_queue_size'):
-            ffmpeg_cmd.extend(['-thread_queue_size', str(memory_opts['thread_queue_size'])])
-        
-        # Configurações específicas do Apple Silicon
-        if is_apple_silicon():
-            # Usar otimizações específicas do VideoToolbox
-            ffmpeg_cmd.extend([
-                '-pix_fmt', 'yuv420p',
-                '-color_primaries', 'bt709',
-                '-color_trc', 'bt709',
-                '-colorspace', 'bt709'
-            ])
-        
-        # Adicionar parâmetros finais
-        ffmpeg_cmd.extend(['-y', output_path])
-        
+
+    return output_args
+
+def _run_ffmpeg(ffmpeg_cmd, output_path, timeout=None):
+    """Executa o FFmpeg e retorna True em caso de sucesso, registrando a falha caso contrário"""
+    try:
         # Executar comando com timeout apropriado
-        timeout = 300 if not is_apple_silicon() else 180  # Apple Silicon é mais rápido
-        
+        if timeout is None:
+            timeout = 300 if not is_apple_silicon() else 180  # Apple Silicon é mais rápido
+
         print(f"Executando: {' '.join(ffmpeg_cmd)}")
-        result = subprocess.run(
-            ffmpeg_cmd, 
-            check=True, 
+        subprocess.run(
+            ffmpeg_cmd,
+            check=True,
             timeout=timeout,
             capture_output=True,
             text=True
         )
-        
+
         return True
 
     except subprocess.TimeoutExpired:
@@ -73,31 +73,362 @@ def extract_segment(input_video, output_path, start_time, end_time, vertical=Fal
         print(f"Erro inesperado: {e}")
         return False
 
-def extract_segments(input_video, selected_times_default, selected_times_vertical):
+def extract_segment_copy(input_video, output_path, start_time, end_time):
+    """Corta o segmento sem recodificar (-c copy), começando no keyframe anterior ao início"""
+    try:
+        # Com cópia de stream o corte só é possível em keyframes
+        keyframe_time = find_keyframe_before(input_video, start_time)
+
+        ffmpeg_cmd = [
+            'ffmpeg',
+            '-ss', str(keyframe_time),
+            '-i', input_video,
+            '-t', str(end_time - keyframe_time),
+            '-map', '0:v:0', '-map', '0:a?',
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            '-movflags', '+faststart',
+            '-y', output_path
+        ]
+    except Exception as e:
+        print(f"Erro inesperado: {e}")
+        return False
+
+    return _run_ffmpeg(ffmpeg_cmd, output_path)
+
+def extract_segment(input_video, output_path, start_time, end_time, vertical=False, threads=None, fast_cut=False):
+    """Extrai segmento de vídeo com otimizações específicas da plataforma
+
+    Com fast_cut=True segmentos default são copiados sem recodificação quando
+    codec e contêiner de origem permitem; caso contrário o vídeo é recodificado.
+    """
+    if fast_cut and not vertical and can_stream_copy(input_video):
+        return extract_segment_copy(input_video, output_path, start_time, end_time)
+
+    try:
+        # Construir comando FFmpeg otimizado para a plataforma
+        ffmpeg_cmd = platform_detector.get_ffmpeg_base_args()
+        
+        # Adicionar parâmetros de entrada
+        ffmpeg_cmd.extend([
+            '-ss', str(start_time),
+            '-i', input_video,
+            '-to', str(end_time - start_time)
+        ])
+        
+        ffmpeg_cmd.extend(_build_output_args(vertical, threads))
+        
+        # Adicionar parâmetros finais
+        ffmpeg_cmd.extend(['-y', output_path])
+    except Exception as e:
+        print(f"Erro inesperado: {e}")
+        return False
+
+    return _run_ffmpeg(ffmpeg_cmd, output_path)
+
+def extract_segment_dual(input_video, default_output_path, vertical_output_path, start_time, end_time, threads=None):
+    """Extrai as versões default e vertical do mesmo trecho decodificando o vídeo uma única vez"""
+    try:
+        ffmpeg_cmd = platform_detector.get_ffmpeg_base_args()
+
+        # -t como opção de entrada vale para as duas saídas
+        ffmpeg_cmd.extend([
+            '-ss', str(start_time),
+            '-t', str(end_time - start_time),
+            '-i', input_video
+        ])
+
+        # Um único decode dividido em dois ramos: original e recortado para 9:16
+        ffmpeg_cmd.extend([
+            '-filter_complex',
+            f"[0:v]split=2[vdefault][vsource];[vsource]{platform_detector.get_vertical_filter()}[vvertical]"
+        ])
+
+        ffmpeg_cmd.extend(['-map', '[vdefault]', '-map', '0:a?'])
+        ffmpeg_cmd.extend(_build_output_args(False, threads, include_filter=False))
+        ffmpeg_cmd.extend(['-y', default_output_path])
+
+        ffmpeg_cmd.extend(['-map', '[vvertical]', '-map', '0:a?'])
+        ffmpeg_cmd.extend(_build_output_args(True, threads, include_filter=False))
+        ffmpeg_cmd.extend(['-y', vertical_output_path])
+    except Exception as e:
+        print(f"Erro inesperado: {e}")
+        return False
+
+    # Duas codificações no mesmo processo: dobrar o timeout padrão
+    timeout = 600 if not is_apple_silicon() else 360
+    return _run_ffmpeg(ffmpeg_cmd, vertical_output_path, timeout=timeout)
+
+# Perfis H.264 reportados pelo ffprobe -> valores aceitos pelo libx264
+X264_PROFILES = {
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+    'high 10': 'high10',
+    'high 4:2:2': 'high422',
+    'high 4:4:4 predictive': 'high444',
+}
+
+def _smart_edge_args(stream_info):
+    """Codificação das bordas compatível com o stream copiado (mesmo codec, perfil e pix_fmt)"""
+    args = ['-an', '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18']
+    profile = X264_PROFILES.get(str(stream_info.get('profile', '')).lower())
+    if profile:
+        args.extend(['-profile:v', profile])
+    if stream_info.get('pix_fmt'):
+        args.extend(['-pix_fmt', stream_info['pix_fmt']])
+    # MPEG-TS mantém SPS/PPS em cada keyframe, permitindo concatenar trechos com parâmetros diferentes
+    args.extend(['-bsf:v', 'h264_mp4toannexb', '-f', 'mpegts'])
+    return args
+
+def extract_segment_smart(input_video, output_path, start_time, end_time, threads=None):
+    """Corte com precisão de quadro recodificando apenas os GOPs parciais das bordas
+
+    O trecho entre o primeiro e o último keyframe da janela é copiado sem
+    recodificação; o início e o fim são recodificados e os três trechos são
+    concatenados. Sem keyframes suficientes na janela, recodifica o segmento inteiro.
+    """
+    stream_info = probe_video_stream(input_video)
+    # Verificações baratas primeiro: só um H.264 copiável justifica ler os pacotes
+    if not stream_info or stream_info.get('codec_name') != 'h264' or not can_stream_copy(input_video):
+        return extract_segment(input_video, output_path, start_time, end_time, threads=threads)
+    keyframes = keyframes_between(input_video, start_time, end_time)
+    if len(keyframes) < 2:
+        return extract_segment(input_video, output_path, start_time, end_time, threads=threads)
+
+    first_keyframe, last_keyframe = keyframes[0], keyframes[-1]
+    work_dir = tempfile.mkdtemp(prefix='.smart_', dir=os.path.dirname(output_path) or None)
+    try:
+        parts = []
+
+        # Borda inicial: do início pedido até o primeiro keyframe
+        if first_keyframe > start_time:
+            head_path = os.path.join(work_dir, 'head.ts')
+            ffmpeg_cmd = ['ffmpeg', '-ss', str(start_time), '-i', input_video,
+                          '-t', str(first_keyframe - start_time)]
+            ffmpeg_cmd.extend(_smart_edge_args(stream_info))
+            if threads:
+                ffmpeg_cmd.extend(['-threads', str(threads)])
+            ffmpeg_cmd.extend(['-y', head_path])
+            if not _run_ffmpeg(ffmpeg_cmd, output_path):
+                return False
+            parts.append(head_path)
+
+        # Miolo: GOPs completos copiados sem recodificação
+        middle_path = os.path.join(work_dir, 'middle.ts')
+        ffmpeg_cmd = [
+            'ffmpeg', '-ss', str(first_keyframe), '-i', input_video,
+            '-t', str(last_keyframe - first_keyframe),
+            '-an', '-c:v', 'copy',
+            '-bsf:v', 'h264_mp4toannexb', '-f', 'mpegts',
+            '-y', middle_path
+        ]
+        if not _run_ffmpeg(ffmpeg_cmd, output_path):
+            return False
+        parts.append(middle_path)
+
+        # Borda final: do último keyframe até o fim pedido
+        if end_time > last_keyframe:
+            tail_path = os.path.join(work_dir, 'tail.ts')
+            ffmpeg_cmd = ['ffmpeg', '-ss', str(last_keyframe), '-i', input_video,
+                          '-t', str(end_time - last_keyframe)]
+            ffmpeg_cmd.extend(_smart_edge_args(stream_info))
+            if threads:
+                ffmpeg_cmd.extend(['-threads', str(threads)])
+            ffmpeg_cmd.extend(['-y', tail_path])
+            if not _run_ffmpeg(ffmpeg_cmd, output_path):
+                return False
+            parts.append(tail_path)
+
+        # Concatenar o vídeo e copiar o áudio da janela original
+        concat_list = os.path.join(work_dir, 'parts.txt')
+        with open(concat_list, 'w') as f:
+            for part in parts:
+                f.write(f"file '{os.path.basename(part)}'\n")
+
+        ffmpeg_cmd = [
+            'ffmpeg',
+            '-f', 'concat', '-safe', '0', '-i', concat_list,
+            '-ss', str(start_time), '-t', str(end_time - start_time), '-i', input_video,
+            '-map', '0:v:0', '-map', '1:a?',
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            '-y', output_path
+        ]
+        return _run_ffmpeg(ffmpeg_cmd, output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def _build_segment_muxer_args(first_minute, count, output_pattern):
+    """Argumentos para dividir uma saída contínua em arquivos de 60 segundos"""
+    config = get_platform_config()
+    args = [
+        # Keyframes forçados em cada minuto para que os cortes sejam exatos
+        '-force_key_frames', 'expr:gte(t,n_forced*60)',
+    ]
+    if config.video_encoder == 'h264_nvenc':
+        args.extend(['-forced-idr', '1'])
+    args.extend([
+        '-f', 'segment',
+        '-segment_time', '60',
+        '-segment_start_number', str(first_minute + 1),
+        '-reset_timestamps', '1',
+        '-segment_format', 'mp4',
+        '-segment_format_options', 'movflags=+faststart',
+        '-y', output_pattern
+    ])
+    return args
+
+def extract_segment_run(input_video, output_folder, video_name, first_minute, count,
+                        default=True, vertical=False, threads=None):
+    """Extrai uma sequência de minutos consecutivos em uma única sessão do FFmpeg
+
+    Os arquivos gerados mantêm os nomes {video}_segment_{n}_default.mp4 /
+    {video}_segment_{n}_vertical.mp4 de uma extração minuto a minuto.
+    """
+    start_time = first_minute * 60
+    end_time = (first_minute + count) * 60
+    # '%' no caminho (a pasta de saída também leva o nome do vídeo) precisa ser
+    # escapado no padrão do muxer de segmentos
+    pattern_prefix = os.path.join(output_folder, video_name).replace('%', '%%')
+    default_pattern = f"{pattern_prefix}_segment_%d_default.mp4"
+    vertical_pattern = f"{pattern_prefix}_segment_%d_vertical.mp4"
+
+    try:
+        ffmpeg_cmd = platform_detector.get_ffmpeg_base_args()
+        ffmpeg_cmd.extend([
+            '-ss', str(start_time),
+            '-t', str(end_time - start_time),
+            '-i', input_video
+        ])
+
+        if default and vertical:
+            ffmpeg_cmd.extend([
+                '-filter_complex',
+                f"[0:v]split=2[vdefault][vsource];[vsource]{platform_detector.get_vertical_filter()}[vvertical]"
+            ])
+            ffmpeg_cmd.extend(['-map', '[vdefault]', '-map', '0:a?'])
+            ffmpeg_cmd.extend(_build_output_args(False, threads, include_filter=False, faststart=False))
+            ffmpeg_cmd.extend(_build_segment_muxer_args(first_minute, count, default_pattern))
+            ffmpeg_cmd.extend(['-map', '[vvertical]', '-map', '0:a?'])
+            ffmpeg_cmd.extend(_build_output_args(True, threads, include_filter=False, faststart=False))
+            ffmpeg_cmd.extend(_build_segment_muxer_args(first_minute, count, vertical_pattern))
+        else:
+            ffmpeg_cmd.extend(['-map', '0:v:0', '-map', '0:a?'])
+            ffmpeg_cmd.extend(_build_output_args(vertical, threads, faststart=False))
+            ffmpeg_cmd.extend(_build_segment_muxer_args(
+                first_minute, count, vertical_pattern if vertical else default_pattern))
+    except Exception as e:
+        print(f"Erro inesperado: {e}")
+        return False
+
+    # O timeout cresce com a quantidade de minutos da sequência
+    outputs = 2 if default and vertical else 1
+    timeout = (300 if not is_apple_silicon() else 180) * count * outputs
+    return _run_ffmpeg(ffmpeg_cmd, default_pattern if default else vertical_pattern, timeout=timeout)
+
+def _group_contiguous(minutes, max_length):
+    """Agrupa minutos ordenados em sequências consecutivas (primeiro minuto, quantidade)"""
+    runs = []
+    for minute in minutes:
+        if runs and runs[-1][0] + runs[-1][1] == minute and runs[-1][1] < max_length:
+            runs[-1][1] += 1
+        else:
+            runs.append([minute, 1])
+    return [tuple(run) for run in runs]
+
+def extract_segments(input_video, selected_times_default, selected_times_vertical, fast_cut=False, smart_render=False):
+    """Extrai os minutos selecionados em paralelo
+
+    fast_cut copia os segmentos default sem recodificar (corte no keyframe);
+    smart_render recodifica só as bordas dos segmentos default, com corte exato.
+    """
     try:
         video_name = os.path.splitext(os.path.basename(input_video))[0]
         output_folder = os.path.join(os.path.dirname(input_video), video_name)
         os.makedirs(output_folder, exist_ok=True)
 
-        all_segments = set(selected_times_default + selected_times_vertical)
+        all_segments = sorted(set(selected_times_default + selected_times_vertical))
+        if not all_segments:
+            return True
 
-        for minute in all_segments:
-            start_time = minute * 60
-            end_time = (minute + 1) * 60
+        # Pool limitado pela capacidade do encoder e pelo número de threads da plataforma
+        max_workers = min(len(all_segments), platform_detector.get_max_parallel_jobs())
+        threads = platform_detector.get_threads_per_job(max_workers) if max_workers > 1 else None
 
-            if minute in selected_times_default:
+        # Separar os minutos pelo tipo de saída; sequências consecutivas do mesmo
+        # tipo viram um único job, limitadas para manter todos os workers ocupados
+        max_run_length = -(-len(all_segments) // max_workers)
+        by_kind = {(True, True): [], (True, False): [], (False, True): []}
+
+        # Montar a lista de jobs (rótulo, sessões do encoder, função, argumentos
+        # posicionais e nomeados); jobs default+vertical abrem duas sessões
+        jobs = []
+        encode_kwargs = {'threads': threads}
+
+        # Corte rápido/smart render: segmentos default tratados um por minuto
+        copy_default = (fast_cut or smart_render) and can_stream_copy(input_video)
+        if copy_default:
+            for minute in sorted(set(selected_times_default)):
                 output_path = os.path.join(output_folder, f"{video_name}_segment_{minute+1}_default.mp4")
-                if not extract_segment(input_video, output_path, start_time, end_time):
-                    raise RuntimeError(f"Failed on default segment {minute+1}")
+                if smart_render:
+                    jobs.append((f"default segment {minute+1}", 1, extract_segment_smart,
+                                 (input_video, output_path, minute * 60, (minute + 1) * 60), encode_kwargs))
+                else:
+                    jobs.append((f"default segment {minute+1}", 1, extract_segment_copy,
+                                 (input_video, output_path, minute * 60, (minute + 1) * 60), {}))
+
+        for minute in all_segments:
+            default = minute in selected_times_default and not copy_default
+            vertical = minute in selected_times_vertical
+            if default or vertical:
+                by_kind[(default, vertical)].append(minute)
+
+        for (default, vertical), minutes in by_kind.items():
+            kind = 'default/vertical' if default and vertical else 'default' if default else 'vertical'
+            sessions = 2 if default and vertical else 1
+            for first_minute, count in _group_contiguous(minutes, max_run_length):
+                start_time = first_minute * 60
+                end_time = (first_minute + 1) * 60
+                default_path = os.path.join(output_folder, f"{video_name}_segment_{first_minute+1}_default.mp4")
+                vertical_path = os.path.join(output_folder, f"{video_name}_segment_{first_minute+1}_vertical.mp4")
+
+                if count > 1:
+                    # Minutos consecutivos: uma sessão do FFmpeg com o muxer de segmentos
+                    jobs.append((f"{kind} segments {first_minute+1}-{first_minute+count}", sessions, extract_segment_run,
+                                 (input_video, output_folder, video_name, first_minute, count, default, vertical), encode_kwargs))
+                elif default and vertical:
+                    # Mesmo minuto nos dois formatos: um único decode com duas saídas
+                    jobs.append((f"{kind} segment {first_minute+1}", sessions, extract_segment_dual,
+                                 (input_video, default_path, vertical_path, start_time, end_time), encode_kwargs))
+                elif default:
+                    jobs.append((f"{kind} segment {first_minute+1}", sessions, extract_segment,
+                                 (input_video, default_path, start_time, end_time, False), encode_kwargs))
+                else:
+                    jobs.append((f"{kind} segment {first_minute+1}", sessions, extract_segment,
+                                 (input_video, vertical_path, start_time, end_time, True), encode_kwargs))
+
+        # O pool conta jobs; os slots limitam as sessões do encoder abertas ao mesmo tempo
+        slots = EncoderSlots(max_workers)
 
-            if minute in selected_times_vertical:
-                output_path = os.path.join(output_folder, f"{video_name}_segment_{minute+1}_vertical.mp4")
-                if not extract_segment(input_video, output_path, start_time, end_time, vertical=True):
-                    raise RuntimeError(f"Failed on vertical segment {minute+1}")
+        def run_job(sessions, func, args, kwargs):
+            with slots.hold(sessions):
+                return func(*args, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (label, executor.submit(run_job, sessions, func, args, kwargs))
+                for label, sessions, func, args, kwargs in jobs
+            ]
+            failed = [label for label, future in futures if not future.result()]
+
+        if failed:
+            raise RuntimeError(f"Failed on {', '.join(failed)}")
 
         logging.info(f"Segments saved in folder: {output_folder}")
         return True
 
     except Exception as e:
         logging.error(f"Error processing video: {str(e)}")
-        return False
\ No newline at end of file
+        return False
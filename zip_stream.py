@@ -0,0 +1,148 @@
+import os
+import struct
+import time
+import zlib
+from typing import Iterator, List, Tuple
+
+# Acima destes limites os campos de 32/16 bits do ZIP exigem registros ZIP64
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+# Valores sentinela que indicam "consulte o registro ZIP64"
+ZIP64_MARKER = 0xFFFFFFFF
+ZIP64_COUNT_MARKER = 0xFFFF
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+class ZipStream:
+    """Gera um arquivo ZIP sem compressão (STORED) sob demanda, sem gravá-lo em disco
+
+    O CRC de cada arquivo é calculado durante o envio e gravado num data
+    descriptor, então o tamanho total é conhecido antes do primeiro byte.
+    """
+
+    def __init__(self, files: List[Tuple[str, str]], chunk_size: int = 1024 * 1024):
+        """files: lista de (nome no arquivo, caminho no disco)"""
+        self.chunk_size = chunk_size
+        self.entries = []
+        for arcname, path in files:
+            stat = os.stat(path)
+            self.entries.append({
+                "arcname": arcname.encode("utf-8"),
+                "path": path,
+                "size": stat.st_size,
+                "dostime": self._dos_time(stat.st_mtime),
+                "zip64": stat.st_size >= ZIP64_LIMIT
+            })
+        self._layout()
+
+    @staticmethod
+    def _dos_time(timestamp: float) -> Tuple[int, int]:
+        t = time.localtime(timestamp)
+        year = max(t.tm_year, 1980)
+        dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+        dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+        return dos_time, dos_date
+
+    def _layout(self) -> None:
+        """Calcula offsets de cada entrada e o tamanho total do arquivo"""
+        offset = 0
+        for entry in self.entries:
+            entry["offset"] = offset
+            offset += len(self._local_header(entry)) + entry["size"] + (24 if entry["zip64"] else 16)
+
+        self.central_directory_offset = offset
+        self.central_directory_size = sum(len(self._central_header(entry, 0)) for entry in self.entries)
+        self.zip64_end = (
+            len(self.entries) >= ZIP64_COUNT_LIMIT
+            or self.central_directory_offset >= ZIP64_LIMIT
+            or self.central_directory_size >= ZIP64_LIMIT
+        )
+        self.content_length = (
+            self.central_directory_offset + self.central_directory_size
+            + (56 + 20 if self.zip64_end else 0) + 22
+        )
+
+    def _local_header(self, entry) -> bytes:
+        version = 45 if entry["zip64"] else 20
+        extra = b""
+        size_field = 0
+        if entry["zip64"]:
+            # Tamanhos reais vão no data descriptor; o extra ZIP64 sinaliza o formato
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            size_field = ZIP64_MARKER
+        dos_time, dos_date = entry["dostime"]
+        return struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034b50, version, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, 0,
+            dos_time, dos_date, 0, size_field, size_field,
+            len(entry["arcname"]), len(extra)
+        ) + entry["arcname"] + extra
+
+    def _data_descriptor(self, entry, crc: int) -> bytes:
+        if entry["zip64"]:
+            return struct.pack("<IIQQ", 0x08074b50, crc, entry["size"], entry["size"])
+        return struct.pack("<IIII", 0x08074b50, crc, entry["size"], entry["size"])
+
+    def _central_header(self, entry, crc: int) -> bytes:
+        zip64_fields = []
+        size = entry["size"]
+        offset = entry["offset"]
+        if size >= ZIP64_LIMIT:
+            zip64_fields.extend([size, size])
+            size = ZIP64_MARKER
+        if offset >= ZIP64_LIMIT:
+            zip64_fields.append(offset)
+            offset = ZIP64_MARKER
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+        version = 45 if zip64_fields or entry["zip64"] else 20
+        dos_time, dos_date = entry["dostime"]
+        return struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014b50, (3 << 8) | version, version, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, 0,
+            dos_time, dos_date, crc, size, size,
+            len(entry["arcname"]), len(extra), 0, 0, 0,
+            0o100644 << 16, offset
+        ) + entry["arcname"] + extra
+
+    def _end_records(self) -> bytes:
+        count = len(self.entries)
+        cd_size = self.central_directory_size
+        cd_offset = self.central_directory_offset
+        records = b""
+        if self.zip64_end:
+            zip64_end_offset = cd_offset + cd_size
+            records += struct.pack(
+                "<IQHHIIQQQQ",
+                0x06064b50, 44, (3 << 8) | 45, 45, 0, 0, count, count, cd_size, cd_offset
+            )
+            records += struct.pack("<IIQI", 0x07064b50, 0, zip64_end_offset, 1)
+            count = ZIP64_COUNT_MARKER if count >= ZIP64_COUNT_LIMIT else count
+            cd_size = ZIP64_MARKER if cd_size >= ZIP64_LIMIT else cd_size
+            cd_offset = ZIP64_MARKER if cd_offset >= ZIP64_LIMIT else cd_offset
+        records += struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, count, count, cd_size, cd_offset, 0)
+        return records
+
+    def __iter__(self) -> Iterator[bytes]:
+        crcs = []
+        for entry in self.entries:
+            yield self._local_header(entry)
+            crc = 0
+            remaining = entry["size"]
+            with open(entry["path"], "rb") as f:
+                while remaining > 0:
+                    block = f.read(min(self.chunk_size, remaining))
+                    if not block:
+                        raise IOError(f"Arquivo alterado durante o download: {entry['path']}")
+                    crc = zlib.crc32(block, crc)
+                    remaining -= len(block)
+                    yield block
+            yield self._data_descriptor(entry, crc)
+            crcs.append(crc)
+
+        for entry, crc in zip(self.entries, crcs):
+            yield self._central_header(entry, crc)
+        yield self._end_records()